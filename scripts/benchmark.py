@@ -51,6 +51,7 @@ def benchmark_potentials():
     r = np.random.uniform(0.8, 3.0, n_pairs)
     r_vec = np.random.randn(n_pairs, 3)
     r_vec = (r_vec.T / np.linalg.norm(r_vec, axis=1)).T * r[:, np.newaxis]
+    r2 = r**2
 
     potentials = {
         "Lennard-Jones": LennardJones(epsilon=1.0, sigma=1.0, rcut=2.5),
@@ -62,13 +63,13 @@ def benchmark_potentials():
     for name, potential in potentials.items():
         # Warm-up
         for _ in range(10):
-            potential.force(r_vec, r)
+            potential.force(r_vec, r2)
 
         # Benchmark
         start_time = time.time()
         for _ in range(100):
-            forces = potential.force(r_vec, r)
-            energies = potential.energy(r)
+            forces = potential.force(r_vec, r2)
+            energies = potential.energy(r2)
         end_time = time.time()
 
         elapsed = end_time - start_time
@@ -0,0 +1,435 @@
+"""
+Numba-compiled kernels for performance-critical loops.
+
+Numba is an optional dependency (``pip install "nanosimlab[accel]"``). When
+it is not installed, the decorators below degrade to no-ops so this module
+still imports; callers check ``NUMBA_AVAILABLE`` and fall back to the NumPy
+implementations instead of running these loops in the interpreter.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+try:
+    from numba import get_num_threads, get_thread_id, njit, prange, set_num_threads
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    NUMBA_AVAILABLE = False
+    prange = range  # type: ignore[misc]
+
+    def njit(*args: Any, **kwargs: Any) -> Any:  # type: ignore[no-redef]
+        """Fallback decorator returning the undecorated function."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    def get_num_threads() -> int:
+        """Fallback: a single thread."""
+        return 1
+
+    def get_thread_id() -> int:
+        """Fallback: the only thread."""
+        return 0
+
+    def set_num_threads(n: int | np.integer[Any]) -> None:
+        """Fallback: threading is not configurable without numba."""
+
+
+@njit(inline="always", fastmath=True)
+def _minimum_image(dx, box, inv_box):
+    """
+    Wrap a displacement component into [-box/2, box/2) for a cubic box.
+
+    Takes the precomputed ``inv_box`` so the hot loops multiply instead of
+    divide; inlining lets LLVM fuse this into a floor and one FMA.
+    """
+    return dx - box * np.floor(dx * inv_box + 0.5)
+
+
+@njit(inline="always", fastmath=True)
+def _hist_pair(frame, i, j, dim, box, inv_box, r_max2, inv_dr, bins, local):
+    """Add the minimum-image distance of pair (i, j) to ``local``."""
+    r2 = 0.0
+    for k in range(dim):
+        dx = _minimum_image(frame[i, k] - frame[j, k], box, inv_box)
+        r2 += dx * dx
+    if r2 < r_max2:
+        b = int(np.sqrt(r2) * inv_dr)
+        if b < bins:
+            local[b] += 1
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def rdf_frame_hist(frame, box, inv_box, r_max2, inv_dr, bins, hist_out):
+    """
+    Histogram unique pair distances of a single frame.
+
+    Particle ``i`` counts its pairs ``(i, j > i)`` into the row of ``hist_out``
+    owned by the running thread, so the parallel loop over ``i`` needs no
+    synchronisation. Counts accumulate across calls; the caller zeroes the
+    rows once and reduces them after the last frame.
+
+    Args:
+        frame: Particle positions (N, dim)
+        box: Periodic box length
+        inv_box: Precomputed 1/box
+        r_max2: Squared maximum distance
+        inv_dr: Inverse bin width
+        bins: Number of histogram bins
+        hist_out: Per-thread histograms (n_threads, bins), accumulated
+    """
+    n, dim = frame.shape
+    for i in prange(n):
+        local = hist_out[get_thread_id()]
+        for j in range(i + 1, n):
+            _hist_pair(frame, i, j, dim, box, inv_box, r_max2, inv_dr, bins, local)
+
+
+@njit(inline="always", fastmath=True)
+def _hist_slot_pair(xs, a, b, dim, box, inv_box, r_max2, inv_dr, bins, local):
+    """Add the minimum-image distance of sorted slots (a, b) to ``local``."""
+    r2 = 0.0
+    for k in range(dim):
+        dx = _minimum_image(xs[k, a] - xs[k, b], box, inv_box)
+        r2 += dx * dx
+    if r2 < r_max2:
+        b = int(np.sqrt(r2) * inv_dr)
+        if b < bins:
+            local[b] += 1
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def rdf_frame_hist_cells(xs, dim, box, inv_box, r_max2, inv_dr, bins,
+                         ncell, cell_start, offsets, hist_out):
+    """
+    Histogram pair distances of a single cell-sorted frame.
+
+    Each sorted slot is paired with the slots after it in its own cell and
+    with every slot in the forward half of the neighbouring cells
+    (``offsets``), so every pair within one cell side is visited exactly once.
+    Counts accumulate into per-thread rows as in ``rdf_frame_hist``. Requires
+    at least three cells per dimension.
+
+    Args:
+        xs: Sorted coordinates (3, N) from ``build_cell_sort``
+        dim: Spatial dimensionality (2 or 3)
+        box: Periodic box length
+        inv_box: Precomputed 1/box
+        r_max2: Squared maximum distance
+        inv_dr: Inverse bin width
+        bins: Number of histogram bins
+        ncell: Number of cells per dimension
+        cell_start: Cell offsets from ``build_cell_sort``
+        offsets: Forward neighbour cell offsets (n_offsets, 3)
+        hist_out: Per-thread histograms (n_threads, bins), accumulated
+    """
+    nz = ncell if dim == 3 else 1
+    for c in prange(ncell * ncell * nz):
+        local = hist_out[get_thread_id()]
+        cz = c % nz
+        cy = (c // nz) % ncell
+        cx = c // (nz * ncell)
+        for a in range(cell_start[c], cell_start[c + 1]):
+            for b in range(a + 1, cell_start[c + 1]):
+                _hist_slot_pair(xs, a, b, dim, box, inv_box, r_max2, inv_dr, bins, local)
+            for o in range(offsets.shape[0]):
+                nc = (((cx + offsets[o, 0]) % ncell) * ncell
+                      + (cy + offsets[o, 1]) % ncell) * nz + (cz + offsets[o, 2]) % nz
+                for b in range(cell_start[nc], cell_start[nc + 1]):
+                    _hist_slot_pair(xs, a, b, dim, box, inv_box, r_max2, inv_dr, bins, local)
+
+
+@njit(inline="always", fastmath=True)
+def _lj_accumulate(x, i, j, dim, box, inv_box, eps24, sigma2, rcut2, F):
+    """
+    Add the Lennard-Jones force of pair (i, j) to ``F[i]``.
+
+    Uses the r²-only form 24ε(2(σ/r)^12 - (σ/r)^6)/r² along ``x[i] - x[j]``,
+    so no square root is taken. ``box <= 0`` means open boundaries. The
+    pair is evaluated in float64 whatever the storage type of ``x``.
+    """
+    dx = np.float64(x[i, 0]) - x[j, 0]
+    dy = np.float64(x[i, 1]) - x[j, 1]
+    dz = np.float64(x[i, 2]) - x[j, 2] if dim == 3 else 0.0
+    if box > 0.0:
+        dx = _minimum_image(dx, box, inv_box)
+        dy = _minimum_image(dy, box, inv_box)
+        dz = _minimum_image(dz, box, inv_box)
+    r2 = dx * dx + dy * dy + dz * dz
+    if 0.0 < r2 < rcut2:
+        sr2 = sigma2 / r2
+        sr6 = sr2 * sr2 * sr2
+        fmag = eps24 * (2.0 * sr6 * sr6 - sr6) / r2
+        F[i, 0] += fmag * dx
+        F[i, 1] += fmag * dy
+        if dim == 3:
+            F[i, 2] += fmag * dz
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def lj_forces_allpairs(x, box, inv_box, eps24, sigma2, rcut2, F):
+    """
+    Lennard-Jones forces from every pair, fused into a single loop.
+
+    Each particle sums the forces from all others, so the parallel loop over
+    ``i`` only ever writes row ``i`` of ``F`` and needs no atomics.
+
+    Args:
+        x: Particle positions (N, dim)
+        box: Periodic box length (<= 0 for open boundaries)
+        inv_box: Precomputed 1/box (ignored for open boundaries)
+        eps24: Precomputed 24ε
+        sigma2: Precomputed σ²
+        rcut2: Squared cutoff radius (inf for no cutoff)
+        F: Forces (N, dim), overwritten
+    """
+    n, dim = x.shape
+    for i in prange(n):
+        F[i, :] = 0
+        for j in range(n):
+            if j != i:
+                _lj_accumulate(x, i, j, dim, box, inv_box, eps24, sigma2, rcut2, F)
+
+
+@njit(cache=True)
+def build_cell_sort(x, box, ncell, cell_start, order, xs):
+    """
+    Counting-sort particles by cell into a structure-of-arrays layout.
+
+    After the call, particles of cell ``c`` occupy sorted slots
+    ``cell_start[c]:cell_start[c + 1]``; ``order[p]`` is the particle in slot
+    ``p`` and ``xs[:, p]`` its coordinates, so each cell's coordinates are
+    contiguous per axis.
+
+    Args:
+        x: Particle positions (N, dim)
+        box: Periodic box length
+        ncell: Number of cells per dimension
+        cell_start: Cell offsets (ncell**dim + 1,), overwritten
+        order: Particle index of each sorted slot (N,), overwritten
+        xs: Sorted coordinates (3, N); rows beyond ``dim`` must be zero
+    """
+    n, dim = x.shape
+    nz = ncell if dim == 3 else 1
+    inv_cell = ncell / box
+    cell = np.empty(n, dtype=np.int64)
+    cell_start[:] = 0
+    for i in range(n):
+        cx = int(np.floor(x[i, 0] * inv_cell)) % ncell
+        cy = int(np.floor(x[i, 1] * inv_cell)) % ncell
+        cz = int(np.floor(x[i, 2] * inv_cell)) % ncell if dim == 3 else 0
+        cell[i] = (cx * ncell + cy) * nz + cz
+        cell_start[cell[i] + 1] += 1
+    for c in range(ncell * ncell * nz):
+        cell_start[c + 1] += cell_start[c]
+    fill = cell_start[:-1].copy()
+    for i in range(n):
+        p = fill[cell[i]]
+        fill[cell[i]] += 1
+        order[p] = i
+        for k in range(dim):
+            xs[k, p] = x[i, k]
+
+
+@njit(inline="always", fastmath=True)
+def _lj_cell_pair(xs, a, b, xa, ya, za, box, inv_box, eps24, sigma2, rcut2, Fl):
+    """
+    Lennard-Jones force of sorted slots (a, b) using Newton's third law.
+
+    Returns the force on ``a`` for the caller to accumulate in registers and
+    subtracts the same force from slot ``b`` of the thread buffer ``Fl``.
+    """
+    dx = _minimum_image(xa - xs[0, b], box, inv_box)
+    dy = _minimum_image(ya - xs[1, b], box, inv_box)
+    dz = _minimum_image(za - xs[2, b], box, inv_box)
+    r2 = dx * dx + dy * dy + dz * dz
+    if 0.0 < r2 < rcut2:
+        sr2 = sigma2 / r2
+        sr6 = sr2 * sr2 * sr2
+        fmag = eps24 * (2.0 * sr6 * sr6 - sr6) / r2
+        Fl[0, b] -= fmag * dx
+        Fl[1, b] -= fmag * dy
+        Fl[2, b] -= fmag * dz
+        return fmag * dx, fmag * dy, fmag * dz
+    return 0.0, 0.0, 0.0
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def lj_forces_cells(xs, box, inv_box, eps24, sigma2, rcut2,
+                    ncell, cell_start, order, offsets, F_local, F):
+    """
+    Lennard-Jones forces over a cell-sorted structure-of-arrays layout.
+
+    Each cell is paired with itself and the forward half of its neighbours
+    (``offsets``, 13 in 3D and 4 in 2D), and every pair is evaluated once
+    with Newton's third law. The inner loop streams over contiguous
+    coordinate rows, which LLVM can vectorise. Cells are split across
+    threads by ``prange``. Each thread accumulates into its own slice of
+    ``F_local``, so no atomics are needed. The slices are summed into ``F``
+    at the end. Requires at least three cells per dimension.
+
+    Args:
+        xs: Sorted coordinates (3, N) from ``build_cell_sort``
+        box: Periodic box length
+        inv_box: Precomputed 1/box
+        eps24: Precomputed 24ε
+        sigma2: Precomputed σ²
+        rcut2: Squared cutoff radius
+        ncell: Number of cells per dimension
+        cell_start: Cell offsets from ``build_cell_sort``
+        order: Particle index of each sorted slot from ``build_cell_sort``
+        offsets: Forward neighbour cell offsets (n_offsets, 3)
+        F_local: Per-thread force buffers (n_threads, 3, N), overwritten
+        F: Forces (N, dim), overwritten
+    """
+    n, dim = F.shape
+    nz = ncell if dim == 3 else 1
+    F_local[:] = 0.0
+    for c in prange(ncell * ncell * nz):
+        Fl = F_local[get_thread_id()]
+        cz = c % nz
+        cy = (c // nz) % ncell
+        cx = c // (nz * ncell)
+        for a in range(cell_start[c], cell_start[c + 1]):
+            xa = np.float64(xs[0, a])
+            ya = np.float64(xs[1, a])
+            za = np.float64(xs[2, a])
+            fx = 0.0
+            fy = 0.0
+            fz = 0.0
+            for b in range(a + 1, cell_start[c + 1]):
+                gx, gy, gz = _lj_cell_pair(xs, a, b, xa, ya, za, box, inv_box,
+                                           eps24, sigma2, rcut2, Fl)
+                fx += gx
+                fy += gy
+                fz += gz
+            for o in range(offsets.shape[0]):
+                nc = (((cx + offsets[o, 0]) % ncell) * ncell
+                      + (cy + offsets[o, 1]) % ncell) * nz + (cz + offsets[o, 2]) % nz
+                for b in range(cell_start[nc], cell_start[nc + 1]):
+                    gx, gy, gz = _lj_cell_pair(xs, a, b, xa, ya, za, box, inv_box,
+                                               eps24, sigma2, rcut2, Fl)
+                    fx += gx
+                    fy += gy
+                    fz += gz
+            Fl[0, a] += fx
+            Fl[1, a] += fy
+            Fl[2, a] += fz
+
+    n_threads = F_local.shape[0]
+    for p in prange(n):
+        i = order[p]
+        for k in range(dim):
+            acc = 0.0
+            for t in range(n_threads):
+                acc += F_local[t, k, p]
+            F[i, k] = acc
+
+
+@njit(cache=True, fastmath=True)
+def run_bd_lj(x, box, eps24, sigma2, rcut2, temperature, gamma, dt, steps,
+              save_every, ncell, cell_start, order, xs, offsets, F_local, F,
+              positions_out, times_out, seed):
+    """
+    Integrate overdamped Langevin dynamics with Lennard-Jones forces.
+
+    The whole step loop (forces, Euler-Maruyama update, periodic wrap and
+    frame output) runs in compiled code. Noise comes from numba's own
+    generator seeded with ``seed``, so trajectories are reproducible but
+    differ from the NumPy integrator for the same simulation seed.
+
+    Args:
+        x: Particle positions (N, dim), updated in place
+        box: Periodic box length (<= 0 for open boundaries)
+        eps24: Precomputed 24ε
+        sigma2: Precomputed σ²
+        rcut2: Squared cutoff radius (inf for no cutoff)
+        temperature: System temperature (reduced units)
+        gamma: Friction coefficient
+        dt: Time step
+        steps: Number of integration steps
+        save_every: Store a frame every N steps (0 to disable)
+        ncell: Cells per dimension (< 3 to use all pairs)
+        cell_start: Cell offsets buffer for ``build_cell_sort``
+        order: Sorted slot buffer for ``build_cell_sort``
+        xs: Sorted coordinates buffer (3, N) for ``build_cell_sort``
+        offsets: Forward neighbour cell offsets (n_offsets, 3)
+        F_local: Per-thread force buffers (n_threads, 3, N)
+        F: Force buffer (N, dim)
+        positions_out: Output frames (steps // save_every, N, dim)
+        times_out: Output frame times (steps // save_every,)
+        seed: Seed for the noise generator
+    """
+    n, dim = x.shape
+    inv_box = 1.0 / box if box > 0.0 else 0.0
+    drift_scale = dt / gamma
+    noise_scale = np.sqrt(2.0 * temperature / gamma * dt)
+    np.random.seed(seed)
+    frame = 0
+    for t in range(steps):
+        if ncell >= 3:
+            build_cell_sort(x, box, ncell, cell_start, order, xs)
+            lj_forces_cells(xs, box, inv_box, eps24, sigma2, rcut2,
+                            ncell, cell_start, order, offsets, F_local, F)
+        else:
+            lj_forces_allpairs(x, box, inv_box, eps24, sigma2, rcut2, F)
+
+        for i in range(n):
+            for k in range(dim):
+                xi = x[i, k] + drift_scale * F[i, k] + noise_scale * np.random.standard_normal()
+                if box > 0.0:
+                    xi -= box * np.floor(xi * inv_box)
+                x[i, k] = xi
+
+        if save_every > 0 and (t + 1) % save_every == 0:
+            positions_out[frame] = x
+            times_out[frame] = (t + 1) * dt
+            frame += 1
+
+
+def cuda_available() -> bool:
+    """Return True if numba can launch kernels on a CUDA device."""
+    if not NUMBA_AVAILABLE:
+        return False
+    try:
+        from numba import cuda
+    except ImportError:  # pragma: no cover
+        return False
+    return bool(cuda.is_available())
+
+
+def warmup_kernels() -> None:
+    """
+    Compile (or load from the on-disk cache) the JIT kernels ahead of use.
+
+    Kernels are compiled lazily per argument type, which would otherwise add
+    the compile time to the first analysis a long-running process performs.
+    Both float32 and float64 trajectories are covered. No-op without numba.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    ncell = 3
+    for dtype in (np.float32, np.float64):
+        for dim in (2, 3):
+            frame = np.zeros((2, dim), dtype=dtype)
+            hist = np.zeros((get_num_threads(), 4), dtype=np.int64)
+            rdf_frame_hist(frame, 3.0, 1.0 / 3.0, 1.0, 4.0, 4, hist)
+            cell_start = np.empty(ncell**dim + 1, dtype=np.int64)
+            order = np.empty(2, dtype=np.int64)
+            xs = np.zeros((3, 2), dtype=dtype)
+            build_cell_sort(frame, 3.0, ncell, cell_start, order, xs)
+            offsets = np.zeros((1, 3), dtype=np.int64)
+            rdf_frame_hist_cells(xs, dim, 3.0, 1.0 / 3.0, 1.0, 4.0, 4,
+                                 ncell, cell_start, offsets, hist)
+            forces = np.empty_like(frame)
+            lj_forces_allpairs(frame, 3.0, 1.0 / 3.0, 24.0, 1.0, 1.0, forces)
+            F_local = np.empty((get_num_threads(), 3, 2))
+            lj_forces_cells(xs, 3.0, 1.0 / 3.0, 24.0, 1.0, 1.0,
+                            ncell, cell_start, order, offsets, F_local, forces)
+            run_bd_lj(frame, 3.0, 24.0, 1.0, 1.0, 1.0, 1.0, 1e-4, 1, 1,
+                      ncell, cell_start, order, xs, offsets, F_local, forces,
+                      frame[None].copy(), np.empty(1), 0)
@@ -11,11 +11,34 @@ from __future__ import annotations
 import numpy as np
 from typing import Tuple, Optional
 
+from ._kernels import (
+    NUMBA_AVAILABLE,
+    build_cell_sort,
+    cuda_available,
+    get_num_threads,
+    rdf_frame_hist,
+    rdf_frame_hist_cells,
+)
+from .system import forward_cell_offsets, minimum_image_displacement
+
+# Frames per block in msd(); keeps the displacement block cache-resident
+_MSD_CHUNK = 64
+
+# Size of the zero-padded particle block transformed at once by the FFT MSD
+_MSD_FFT_BLOCK_BYTES = 1 * 1024 * 1024
+
+# Target size of the pair-displacement batch in the NumPy RDF path
+_RDF_BATCH_BYTES = 4 * 1024 * 1024
+
+# Below this particle count the brute-force O(N^2) pair loop beats cell lists
+_CELL_LIST_MIN_N = 256
+
 
 def msd(
     positions: np.ndarray, 
     times: np.ndarray, 
-    box: Optional[float] = None
+    box: Optional[float] = None,
+    method: str = "fft"
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compute mean-squared displacement (MSD) from trajectory.
@@ -23,35 +46,98 @@ def msd(
     The MSD quantifies particle diffusion and is used to determine
     diffusion coefficients via the Einstein relation: D = MSD/(2*dim*t).
     
+    The default 'fft' method averages over all time origins,
+    MSD(m) = <|r(t+m) - r(t)|^2>_t, in O(T log T) using the fast correlation
+    algorithm; it assumes evenly spaced frames and always computes in double
+    precision, since the estimator subtracts two large sums, transforming a
+    block of particles at a time to bound memory use. The 'origin'
+    method only measures displacements from the first frame and keeps the
+    dtype of ``positions`` (e.g. float32) for its intermediates.
+    
     Args:
         positions: Trajectory positions (T, N, dim)
         times: Time points (T,)
-        box: Box length for unwrapping (basic implementation)
+        box: Box length for unwrapping periodic trajectories
+        method: 'fft' (all time origins) or 'origin' (first frame only)
         
     Returns:
-        Tuple of (times, msd_values)
+        Tuple of (times, msd_values); for 'fft' the times are lag times
+        measured from times[0]
     """
+    if method == "fft":
+        return times - times[0], _msd_fft(positions, box)
+    if method != "origin":
+        raise ValueError(f"Unknown MSD method: {method}")
+    
     T, N, dim = positions.shape
+    msd_t = np.empty(T)
+    p0 = positions[0]
     
-    # Compute displacements from initial positions
-    disp = positions - positions[0]
+    # Process a block of frames at a time so only one block of
+    # displacements is resident instead of a full (T, N, dim) copy;
+    # the block and wrap scratch buffers are reused across blocks
+    block = np.empty((min(T, _MSD_CHUNK), N, dim), dtype=positions.dtype)
+    scratch = np.empty_like(block) if box is not None else None
+    for t0 in range(0, T, _MSD_CHUNK):
+        frames = positions[t0:t0 + _MSD_CHUNK]
+        disp = np.subtract(frames, p0, out=block[:len(frames)])
+        
+        # Basic unwrapping for periodic boundaries (nearest image)
+        if box is not None and scratch is not None:
+            minimum_image_displacement(disp, box, out=disp, scratch=scratch[:len(frames)])
+        
+        # Mean-squared displacement averaged over particles
+        msd_t[t0:t0 + _MSD_CHUNK] = np.einsum('tij,tij->t', disp, disp) / N
     
-    # Basic unwrapping for periodic boundaries
-    if box is not None:
-        # Simple unwrapping - for small time steps this gives reasonable MSD
-        disp = (disp + box/2) % box - box/2
+    return times, msd_t
+
+
+def _msd_fft(positions: np.ndarray, box: Optional[float]) -> np.ndarray:
+    """Time-origin averaged MSD via the FFT autocorrelation (FCA) algorithm."""
+    T, N, dim = positions.shape
+    m = np.arange(T)
+    counts = (T - m)[:, np.newaxis]
     
-    # Mean-squared displacement averaged over particles
-    msd_t = (disp**2).sum(axis=2).mean(axis=1)
+    # Particles are independent, so transform a block of them at a time;
+    # the zero-padded float64 block bounds the working set regardless of N
+    block = max(1, _MSD_FFT_BLOCK_BYTES // (8 * 2 * T * dim))
+    msd_t = np.zeros(T)
+    for p0 in range(0, N, block):
+        x = np.array(positions[:, p0:p0 + block], dtype=np.float64)
+        
+        # Unwrap periodic trajectories by accumulating nearest-image steps,
+        # assuming particles move less than box/2 between saved frames
+        if box is not None:
+            steps = x[1:] - x[:-1]
+            minimum_image_displacement(steps, box, out=steps)
+            np.cumsum(steps, axis=0, out=x[1:])
+            x[1:] += x[0]
+        
+        # S1(m) = sum_t |r(t)|^2 + |r(t+m)|^2 over the T-m available origins
+        d = np.einsum('tij,tij->ti', x, x)
+        cs = np.concatenate([np.zeros((1, d.shape[1])), np.cumsum(d, axis=0)])
+        total = cs[-1]
+        s1 = 2 * total - cs[m] - (total - cs[T - m])
+        
+        # S2(m) = sum_t r(t).r(t+m) via the Wiener-Khinchin theorem
+        f = np.fft.rfft(x, n=2 * T, axis=0)
+        s2 = np.fft.irfft(f * f.conj(), n=2 * T, axis=0)[:T].sum(axis=2)
+        
+        msd_t += ((s1 - 2 * s2) / counts).sum(axis=1)
+    msd_t /= N
     
-    return times, msd_t
+    # Lag zero is exactly zero; clip round-off elsewhere
+    msd_t[0] = 0.0
+    return np.maximum(msd_t, 0.0)
 
 
 def rdf(
     positions: np.ndarray, 
     box: float, 
     r_max: Optional[float] = None, 
-    bins: int = 100
+    bins: int = 100,
+    backend: str = "auto",
+    smooth: bool = False
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compute radial distribution function g(r) from trajectory.
@@ -60,11 +146,20 @@ def rdf(
     from a reference particle, normalized by the bulk density. It reveals
     structural ordering and phase behavior in nanoparticle systems.
     
+    Pair displacements are computed in the dtype of ``positions``; passing
+    float32 trajectories halves memory traffic with negligible effect on
+    the histogram.
+    
     Args:
         positions: Trajectory positions (T, N, dim)
         box: Periodic box length
         r_max: Maximum distance (default: box/2)
         bins: Number of histogram bins
+        backend: Pair kernel: 'numpy', 'numba', 'cuda' or 'auto' (numba if
+            installed). 'cuda' falls back to the CPU kernels without a GPU
+        smooth: Spread each pair over the two nearest bin centres with a
+            rectangular kernel instead of counting it in one bin, giving a
+            less noisy g(r) at the same bin count (NumPy backend only)
         
     Returns:
         Tuple of (r_values, g_values)
@@ -75,33 +170,108 @@ def rdf(
     
     if r_max is None:
         r_max = 0.5 * box
-        
-    # Create histogram bins
-    bin_edges = np.linspace(0, r_max, bins + 1)
-    dr = bin_edges[1] - bin_edges[0]
-    r = (bin_edges[:-1] + bin_edges[1:]) / 2
     
-    g = np.zeros(bins)
+    counts = pair_histogram(
+        positions, box, r_max=r_max, bins=bins, backend=backend, smooth=smooth
+    )
+    return normalize_rdf(counts, box, r_max, n_particles=N, n_frames=T, dim=dim)
+
+
+def pair_histogram(
+    positions: np.ndarray,
+    box: float,
+    r_max: Optional[float] = None,
+    bins: int = 100,
+    backend: str = "auto",
+    smooth: bool = False
+) -> np.ndarray:
+    """
+    Count unique minimum-image pair distances over all frames.
     
-    # Accumulate histogram over all frames
-    for frame in positions:
-        # Compute all pairwise distances
-        diffs = frame[np.newaxis, :, :] - frame[:, np.newaxis, :]
-        
-        # Apply minimum image convention
-        diffs = diffs - box * np.round(diffs / box)
+    This is the raw histogram behind rdf(). Histograms taken at a fine
+    resolution can be cached and rebinned with rebin_histogram() instead of
+    revisiting every pair.
+    
+    Args:
+        positions: Trajectory positions (T, N, dim)
+        box: Periodic box length
+        r_max: Maximum distance (default: box/2)
+        bins: Number of histogram bins on [0, r_max)
+        backend: Pair kernel, as for rdf()
+        smooth: Use rectangular-kernel weights, as for rdf()
         
-        # Calculate distances
-        dists = np.linalg.norm(diffs, axis=2)
+    Returns:
+        Pair counts per bin (bins,)
+    """
+    if r_max is None:
+        r_max = 0.5 * box
+    
+    if smooth:
+        if backend not in ("auto", "numpy"):
+            raise ValueError("Smoothed histograms require backend='numpy'")
+        return _pair_histogram_numpy(positions, box, r_max, bins, smooth=True)
+    
+    if backend == "auto" or (backend == "cuda" and not cuda_available()):
+        backend = "numba" if NUMBA_AVAILABLE else "numpy"
+
+    if backend == "cuda":
+        from ._cuda_kernels import rdf_hist_cuda
+        return rdf_hist_cuda(positions, box, r_max, bins)
+    if backend == "numba":
+        if not NUMBA_AVAILABLE:
+            raise ImportError("backend='numba' requires the numba package")
+        return _pair_histogram_numba(positions, box, r_max, bins)
+    if backend == "numpy":
+        return _pair_histogram_numpy(positions, box, r_max, bins)
+    raise ValueError(f"Unknown RDF backend: {backend}")
+
+
+def rebin_histogram(counts: np.ndarray, bins: int) -> np.ndarray:
+    """
+    Merge adjacent histogram bins into a coarser histogram.
+    
+    Args:
+        counts: Fine histogram (M,)
+        bins: Number of coarse bins; must divide M
         
-        # Extract upper triangular (unique pairs)
-        iu = np.triu_indices(N, k=1)
-        pair_dists = dists[iu]
+    Returns:
+        Coarse histogram (bins,)
+    """
+    if bins <= 0 or len(counts) % bins:
+        raise ValueError(f"Cannot rebin {len(counts)} bins into {bins}")
+    return counts.reshape(bins, -1).sum(axis=1)
+
+
+def normalize_rdf(
+    counts: np.ndarray,
+    box: float,
+    r_max: float,
+    n_particles: int,
+    n_frames: int,
+    dim: int = 3
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalize a pair-distance histogram to g(r).
+    
+    Args:
+        counts: Pair counts per bin on [0, r_max) (bins,)
+        box: Periodic box length
+        r_max: Maximum distance covered by the histogram
+        n_particles: Number of particles per frame
+        n_frames: Number of frames accumulated in ``counts``
+        dim: Spatial dimensionality
         
-        # Add to histogram
-        hist, _ = np.histogram(pair_dists, bins=bin_edges)
-        g += hist
+    Returns:
+        Tuple of (r_values, g_values)
+    """
+    bins = len(counts)
+    N, T = n_particles, n_frames
     
+    # Bin centres and width
+    bin_edges = np.linspace(0, r_max, bins + 1)
+    dr = bin_edges[1] - bin_edges[0]
+    r = (bin_edges[:-1] + bin_edges[1:]) / 2
+
     # Normalize to get g(r)
     volume = box**dim
     density = N / volume
@@ -120,11 +290,173 @@ def rdf(
     # Avoid division by zero
     n_ideal = np.where(n_ideal > 0, n_ideal, 1)
     
-    g = g / n_ideal
+    g = counts / n_ideal
     
     return r, g
 
 
+def rdf_spectral(
+    positions: np.ndarray,
+    box: float,
+    r_max: Optional[float] = None,
+    n_modes: int = 20,
+    n_points: int = 200
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute g(r) from a Legendre series expansion instead of a histogram.
+    
+    Each pair distance contributes P_k(x) to the mode coefficients, with
+    x = 2r/r_max - 1 mapping [0, r_max] onto [-1, 1]. No binning is
+    involved, so the estimate is smooth and can be evaluated on any grid.
+    Storage is O(n_modes) rather than O(bins). Truncating the series blurs
+    features narrower than about r_max/n_modes, and the estimate is
+    unreliable very close to r = 0 where the shell volume vanishes.
+    
+    Args:
+        positions: Trajectory positions (T, N, dim)
+        box: Periodic box length
+        r_max: Maximum distance (default: box/2)
+        n_modes: Number of Legendre modes
+        n_points: Number of evenly spaced points on which g(r) is evaluated
+        
+    Returns:
+        Tuple of (r_values, g_values)
+    """
+    assert box is not None, "RDF calculation requires periodic boundaries"
+    
+    T, N, dim = positions.shape
+    if dim not in (2, 3):
+        raise ValueError("RDF only supports 2D and 3D systems")
+    
+    if r_max is None:
+        r_max = 0.5 * box
+    
+    iu0, iu1 = np.triu_indices(N, k=1)
+    r_max2 = r_max * r_max
+    coeffs = np.zeros(n_modes)
+    
+    for frame in positions:
+        d = frame[iu0] - frame[iu1]
+        minimum_image_displacement(d, box, out=d)
+        r2 = np.einsum('ij,ij->i', d, d)
+        x = 2.0 * np.sqrt(r2[r2 < r_max2]) / r_max - 1.0
+        
+        # Sum P_k(x) over pairs with the three-term Legendre recurrence
+        p_prev, p_curr = np.ones_like(x), x
+        coeffs[0] += len(x)
+        if n_modes > 1:
+            coeffs[1] += x.sum()
+        for k in range(1, n_modes - 1):
+            p_prev, p_curr = p_curr, ((2 * k + 1) * x * p_curr - k * p_prev) / (k + 1)
+            coeffs[k + 1] += p_curr.sum()
+    
+    # Orthogonal projection gives the pair density per unit x; dx/dr = 2/r_max
+    coeffs *= (2 * np.arange(n_modes) + 1) / 2
+    r = (np.arange(n_points) + 0.5) * (r_max / n_points)
+    pair_density = np.polynomial.legendre.legval(2 * r / r_max - 1, coeffs) * (2 / r_max)
+    
+    # Ideal-gas pair density per unit r
+    density = N / box**dim
+    shell_area = 4 * np.pi * r**2 if dim == 3 else 2 * np.pi * r
+    g = pair_density / (density * shell_area * N * T / 2)
+    
+    return r, g
+
+
+def _pair_histogram_numpy(
+    positions: np.ndarray,
+    box: float,
+    r_max: float,
+    bins: int,
+    smooth: bool = False
+) -> np.ndarray:
+    """Histogram unique pair distances over all frames with NumPy."""
+    T, N, dim = positions.shape
+    g = np.zeros(bins)
+
+    # Unique pairs and scalar factors are invariant across frames
+    iu0, iu1 = np.triu_indices(N, k=1)
+    inv_dr = bins / r_max
+    r_max2 = r_max * r_max
+    if smooth:
+        # Pairs up to half a bin beyond r_max still feed the last bin
+        r_max2 = (r_max + 0.5 / inv_dr)**2
+
+    # Process several frames per iteration to amortize interpreter overhead,
+    # bounded so the batch of pair displacements stays small
+    n_pairs = max(len(iu0), 1)
+    chunk = int(np.clip(_RDF_BATCH_BYTES // (n_pairs * dim * positions.itemsize), 1, 32))
+
+    for t0 in range(0, T, chunk):
+        batch = positions[t0:t0 + chunk]
+
+        # Displacements for unique pairs only (K, N*(N-1)/2, dim)
+        d = batch[:, iu0] - batch[:, iu1]
+
+        # Apply minimum image convention in place
+        minimum_image_displacement(d, box, out=d)
+
+        # Squared distances; only in-range pairs need a square root
+        r2 = np.einsum('tij,tij->ti', d, d)
+        x = np.sqrt(r2[r2 < r_max2]) * inv_dr
+
+        if smooth:
+            # Rectangular kernel one bin wide centred on each distance: split
+            # the pair between the two nearest bin centres, reflecting the
+            # share below the first centre back into bin 0
+            x -= 0.5
+            lo = np.floor(x)
+            w = x - lo
+            lo = lo.astype(np.intp)
+            g += np.bincount(np.maximum(lo, 0), weights=1.0 - w, minlength=bins + 1)[:bins]
+            g += np.bincount(lo + 1, weights=w, minlength=bins + 1)[:bins]
+            continue
+
+        # Direct bin indexing instead of np.histogram's search
+        g += np.bincount(x.astype(np.intp), minlength=bins)[:bins]
+
+    return g
+
+
+def _pair_histogram_numba(
+    positions: np.ndarray,
+    box: float,
+    r_max: float,
+    bins: int
+) -> np.ndarray:
+    """Histogram unique pair distances over all frames with the JIT kernel."""
+    T, N, dim = positions.shape
+    # One histogram row per thread, accumulated over every frame
+    hist_out = np.zeros((get_num_threads(), bins), dtype=np.int64)
+    inv_box = 1.0 / box
+    r_max2 = r_max * r_max
+    inv_dr = bins / r_max
+
+    # Cells of side >= r_max turn the O(N^2) pair loop into O(N);
+    # at least three cells per side are needed so no pair is counted twice
+    ncell = int(box // r_max)
+    if N >= _CELL_LIST_MIN_N and ncell >= 3:
+        offsets = forward_cell_offsets(dim, padded=True)
+        cell_start = np.empty(ncell**dim + 1, dtype=np.int64)
+        order = np.empty(N, dtype=np.int64)
+        xs = np.zeros((3, N), dtype=positions.dtype)
+        for frame in positions:
+            build_cell_sort(np.ascontiguousarray(frame), box, ncell, cell_start, order, xs)
+            rdf_frame_hist_cells(
+                xs, dim, box, inv_box, r_max2, inv_dr, bins,
+                ncell, cell_start, offsets, hist_out
+            )
+        return hist_out.sum(axis=0).astype(np.float64)
+
+    for frame in positions:
+        rdf_frame_hist(
+            np.ascontiguousarray(frame), box, inv_box,
+            r_max2, inv_dr, bins, hist_out
+        )
+
+    return hist_out.sum(axis=0).astype(np.float64)
+
+
 def diffusion_coefficient(
     times: np.ndarray, 
     msd_values: np.ndarray, 
@@ -158,18 +490,20 @@ def diffusion_coefficient(
     t_fit = times[mask]
     msd_fit = msd_values[mask]
     
-    # Linear fit: MSD = slope * t + intercept
-    coeffs = np.polyfit(t_fit, msd_fit, 1)
-    slope = coeffs[0]
+    # Closed-form least-squares line MSD = slope * t + intercept; for a
+    # straight-line fit R^2 is the squared correlation coefficient
+    dt = t_fit - t_fit.mean()
+    dm = msd_fit - msd_fit.mean()
+    sxx = np.dot(dt, dt)
+    sxy = np.dot(dt, dm)
+    syy = np.dot(dm, dm)
+    slope = sxy / sxx
     
     # Diffusion coefficient from Einstein relation
     D = slope / (2 * dim)
     
     # Calculate R-squared
-    msd_pred = np.polyval(coeffs, t_fit)
-    ss_res = np.sum((msd_fit - msd_pred)**2)
-    ss_tot = np.sum((msd_fit - np.mean(msd_fit))**2)
-    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
+    r_squared = sxy * sxy / (sxx * syy) if syy > 0 else 0
     
     return D, r_squared
 
@@ -184,9 +518,7 @@ def end_to_end_distance(positions: np.ndarray) -> np.ndarray:
     Returns:
         End-to-end distances for each frame (T,)
     """
-    # Distance between first and last particle (polymer ends)
-    end_to_end = np.linalg.norm(
-        positions[:, -1, :] - positions[:, 0, :], 
-        axis=1
-    )
-    return end_to_end
+    # Distance between first and last particle (polymer ends); einsum fuses
+    # the square-and-sum into one pass without an intermediate array
+    diff = positions[:, -1, :] - positions[:, 0, :]
+    return np.sqrt(np.einsum('ti,ti->t', diff, diff))
@@ -7,21 +7,38 @@ through a web interface.
 
 from __future__ import annotations
 
+import asyncio
 import io
 import json
+import multiprocessing
+import os
+import queue
+import shutil
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
-from fastapi import BackgroundTasks, FastAPI, File, HTTPException, UploadFile
+from fastapi import (
+    BackgroundTasks,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from . import __version__
-from .analysis import msd, rdf
+from ._kernels import warmup_kernels
+from .analysis import msd, normalize_rdf, pair_histogram, rdf, rebin_histogram
 from .potentials import LennardJones, Yukawa
-from .system import BDSimulation
+from .system import BDSimulation, load_positions
 
 
 # Pydantic models for API requests/responses
@@ -55,12 +72,17 @@ class AnalysisConfig(BaseModel):
     compute_rdf: bool = Field(True, description="Compute radial distribution function")
     rdf_bins: int = Field(100, ge=10, le=1000, description="Number of RDF bins")
     rdf_max: Optional[float] = Field(None, description="Maximum RDF distance")
+    rdf_backend: str = Field(
+        "auto", description="RDF pair kernel: 'auto', 'numpy', 'numba' or 'cuda'"
+    )
 
 
 class SimulationStatus(BaseModel):
     """Status of a simulation job."""
     job_id: str = Field(..., description="Unique job identifier")
-    status: str = Field(..., description="Job status: 'running', 'completed', 'failed'")
+    status: str = Field(
+        ..., description="Job status: 'queued', 'running', 'completed', 'failed'"
+    )
     progress: float = Field(0.0, ge=0, le=1, description="Completion progress (0-1)")
     message: str = Field("", description="Status message")
     result: Optional[Dict[str, Any]] = Field(None, description="Simulation results")
@@ -76,6 +98,87 @@ class HealthCheck(BaseModel):
 # Global storage for simulation jobs (in production, use Redis/database)
 simulation_jobs: Dict[str, SimulationStatus] = {}
 
+# Fine-resolution RDF pair histograms of completed jobs, rebinned on request
+rdf_histograms: Dict[str, Dict[str, Any]] = {}
+
+# Worker processes running simulation jobs, created on first use
+_executor: Optional[ProcessPoolExecutor] = None
+
+# (job_id, progress, message) updates sent by workers to the server process
+_progress_queue: Optional[Any] = None
+
+# The progress queue as seen from inside a worker process
+_worker_progress: Optional[Any] = None
+
+# Seconds between progress checks while a job runs in a worker
+PROGRESS_POLL_INTERVAL = 0.25
+
+# Upper bound on the resolution of cached RDF histograms
+RAW_RDF_BINS = 1000
+
+# Media type of Arrow IPC trajectory streams
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+# Directory holding binary trajectory files for completed jobs
+RESULTS_DIR = Path(tempfile.gettempdir()) / "nanosimlab"
+
+
+def trajectory_path(job_id: str) -> Path:
+    """Path of the stored trajectory file for a job."""
+    return RESULTS_DIR / f"{job_id}.npz"
+
+
+def completed_trajectory_path(job_id: str) -> Path:
+    """Trajectory file of a completed job, raising HTTP errors otherwise."""
+    if job_id not in simulation_jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job = simulation_jobs[job_id]
+    if job.status != "completed":
+        raise HTTPException(status_code=400, detail=f"Job status: {job.status}")
+
+    path = trajectory_path(job_id)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Trajectory file not found")
+
+    return path
+
+
+def iter_trajectory_arrow(path: Path) -> Iterator[bytes]:
+    """
+    Encode a stored trajectory as an Arrow IPC stream, one batch per frame.
+
+    Rows hold (t, particle, x, y[, z]) so clients can read the trajectory as
+    a flat table with ``pyarrow.ipc.open_stream``.
+    """
+    import pyarrow as pa
+
+    with np.load(path) as data:
+        positions = data["positions"]
+        times = data["times"]
+
+    n_frames, n, dim = positions.shape
+    axes = ["x", "y", "z"][:dim]
+    coord_type = pa.from_numpy_dtype(positions.dtype)
+    schema = pa.schema(
+        [("t", pa.float64()), ("particle", pa.int32())]
+        + [(axis, coord_type) for axis in axes]
+    )
+    particle = pa.array(np.arange(n, dtype=np.int32))
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for frame, t in zip(positions, times):
+            columns = [pa.array(np.full(n, t)), particle]
+            columns += [pa.array(np.ascontiguousarray(frame[:, k])) for k in range(dim)]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+
+    # End-of-stream marker written when the writer closes
+    yield sink.getvalue()
+
 
 def create_potential(config: PotentialConfig):
     """Create potential object from configuration."""
@@ -95,85 +198,231 @@ def create_potential(config: PotentialConfig):
         raise ValueError(f"Unsupported potential type: {config.type}")
 
 
-def run_simulation_task(job_id: str, sim_config: SimulationConfig, analysis_config: AnalysisConfig):
-    """Background task for running simulation."""
-    try:
-        # Update status to running
-        simulation_jobs[job_id].status = "running"
-        simulation_jobs[job_id].progress = 0.1
-        simulation_jobs[job_id].message = "Initializing simulation..."
-
-        # Create potential
-        potential = create_potential(sim_config.potential)
-
-        # Create simulation
-        sim = BDSimulation(
-            n=sim_config.n_particles,
-            box=sim_config.box_size,
-            dim=sim_config.dimension,
-            temperature=sim_config.temperature,
-            gamma=sim_config.gamma,
-            potential=potential,
-            seed=sim_config.seed
-        )
+def rdf_from_histogram(cached: Dict[str, Any], bins: int) -> Dict[str, List[float]]:
+    """Rebin a cached pair histogram and normalize it to g(r)."""
+    r_values, g_values = normalize_rdf(
+        rebin_histogram(cached["counts"], bins),
+        box=cached["box"],
+        r_max=cached["r_max"],
+        n_particles=cached["n_particles"],
+        n_frames=cached["n_frames"],
+        dim=cached["dim"]
+    )
+    return {"r": r_values.tolist(), "g": g_values.tolist()}
 
-        simulation_jobs[job_id].progress = 0.2
-        simulation_jobs[job_id].message = "Running simulation..."
 
-        # Run simulation
-        trajectory = sim.run(
-            steps=sim_config.steps,
-            dt=sim_config.dt,
-            save_every=sim_config.save_every
-        )
+def report_progress(job_id: str, progress: float, message: str) -> None:
+    """Send a progress update from a worker process; no-op outside workers."""
+    if _worker_progress is not None:
+        _worker_progress.put((job_id, progress, message))
+
+
+def drain_progress() -> None:
+    """Apply queued worker progress updates to unfinished jobs."""
+    if _progress_queue is None:
+        return
+    while True:
+        try:
+            job_id, progress, message = _progress_queue.get_nowait()
+        except queue.Empty:
+            return
+        job = simulation_jobs.get(job_id)
+        if job is not None and job.status in ("queued", "running"):
+            job.status = "running"
+            job.progress = progress
+            job.message = message
+
+
+def execute_simulation(
+    job_id: str,
+    sim_params: Dict[str, Any],
+    analysis_params: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Run a simulation and its analysis; executed in a worker process.
+
+    Takes plain dictionaries so the arguments pickle cheaply, and returns the
+    job results together with the raw RDF pair histogram (if computed) for
+    the parent process to store.
+    """
+    report_progress(job_id, 0.1, "Running simulation...")
+    sim_config = SimulationConfig(**sim_params)
+    analysis_config = AnalysisConfig(**analysis_params)
+
+    # Create potential
+    potential = create_potential(sim_config.potential)
+
+    # Create simulation
+    sim = BDSimulation(
+        n=sim_config.n_particles,
+        box=sim_config.box_size,
+        dim=sim_config.dimension,
+        temperature=sim_config.temperature,
+        gamma=sim_config.gamma,
+        potential=potential,
+        seed=sim_config.seed
+    )
+
+    # Run simulation
+    trajectory = sim.run(
+        steps=sim_config.steps,
+        dt=sim_config.dt,
+        save_every=sim_config.save_every
+    )
 
-        simulation_jobs[job_id].progress = 0.8
-        simulation_jobs[job_id].message = "Analyzing results..."
-
-        # Prepare results
-        results = {
-            "trajectory": {
-                "positions": trajectory["positions"].tolist(),
-                "times": trajectory["times"].tolist(),
-                "box": trajectory["box"],
-                "dimension": trajectory["dim"],
-                "n_frames": len(trajectory["times"]),
-                "n_particles": sim_config.n_particles
-            },
-            "parameters": sim_config.dict()
+    # Brownian trajectories do not need double precision; float32 halves
+    # storage and the memory traffic of the MSD/RDF analysis below
+    positions = trajectory["positions"].astype(np.float32, copy=False)
+
+    # Store the trajectory as a binary file rather than nested JSON lists
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        trajectory_path(job_id),
+        positions=positions,
+        times=trajectory["times"],
+        box=trajectory["box"],
+        dim=trajectory["dim"],
+        n_particles=trajectory["n_particles"]
+    )
+
+    # Prepare results
+    results = {
+        "trajectory": {
+            "result_url": f"/simulate/{job_id}/download",
+            "box": trajectory["box"],
+            "dimension": trajectory["dim"],
+            "n_frames": len(trajectory["times"]),
+            "n_particles": sim_config.n_particles
+        },
+        "parameters": sim_params
+    }
+    histogram = None
+    report_progress(job_id, 0.6, "Analyzing trajectory...")
+
+    # Run analysis if requested
+    if analysis_config.compute_msd:
+        times, msd_values = msd(positions, trajectory["times"], box=trajectory["box"])
+        results["analysis"] = results.get("analysis", {})
+        results["analysis"]["msd"] = {
+            "times": times.tolist(),
+            "values": msd_values.tolist()
+        }
+        report_progress(job_id, 0.8, "Computing radial distribution function...")
+
+    if analysis_config.compute_rdf:
+        # Keep the pair histogram at the finest multiple of the requested
+        # bin count so other resolutions can be served without the
+        # O(N^2 T) pair pass
+        box = trajectory["box"]
+        r_max = analysis_config.rdf_max or 0.5 * box
+        raw_bins = analysis_config.rdf_bins * (RAW_RDF_BINS // analysis_config.rdf_bins)
+        histogram = {
+            "counts": pair_histogram(
+                positions,
+                box=box,
+                r_max=r_max,
+                bins=raw_bins,
+                backend=analysis_config.rdf_backend
+            ),
+            "box": box,
+            "r_max": r_max,
+            "n_particles": positions.shape[1],
+            "n_frames": positions.shape[0],
+            "dim": trajectory["dim"]
         }
+        results["analysis"] = results.get("analysis", {})
+        results["analysis"]["rdf"] = rdf_from_histogram(histogram, analysis_config.rdf_bins)
 
-        # Run analysis if requested
-        if analysis_config.compute_msd:
-            times, msd_values = msd(trajectory["positions"], trajectory["times"], box=trajectory["box"])
-            results["analysis"] = results.get("analysis", {})
-            results["analysis"]["msd"] = {
-                "times": times.tolist(),
-                "values": msd_values.tolist()
-            }
+    return results, histogram
 
-        if analysis_config.compute_rdf:
-            r_values, g_values = rdf(
-                trajectory["positions"],
-                box=trajectory["box"],
-                r_max=analysis_config.rdf_max,
-                bins=analysis_config.rdf_bins
-            )
-            results["analysis"] = results.get("analysis", {})
-            results["analysis"]["rdf"] = {
-                "r": r_values.tolist(),
-                "g": g_values.tolist()
-            }
 
-        # Update status to completed
-        simulation_jobs[job_id].status = "completed"
-        simulation_jobs[job_id].progress = 1.0
-        simulation_jobs[job_id].message = "Simulation completed successfully"
-        simulation_jobs[job_id].result = results
+async def run_simulation_task(
+    job_id: str,
+    sim_config: SimulationConfig,
+    analysis_config: AnalysisConfig
+) -> None:
+    """
+    Background task running a simulation in the worker process pool.
+
+    The job stays 'queued' until a worker picks it up; the worker then marks
+    it 'running' and reports coarse progress, which is applied here while
+    waiting for the result.
+    """
+    job = simulation_jobs[job_id]
+
+    # CPU-bound work runs in a separate process so the event loop stays
+    # responsive and jobs use all cores
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        get_executor(),
+        execute_simulation,
+        job_id,
+        sim_config.model_dump(),
+        analysis_config.model_dump()
+    )
+    while not future.done():
+        await asyncio.wait({future}, timeout=PROGRESS_POLL_INTERVAL)
+        drain_progress()
 
+    try:
+        results, histogram = future.result()
     except Exception as e:
-        simulation_jobs[job_id].status = "failed"
-        simulation_jobs[job_id].message = f"Simulation failed: {str(e)}"
+        job.status = "failed"
+        job.message = f"Simulation failed: {str(e)}"
+        return
+
+    # The job may have been deleted while it was running
+    if job_id not in simulation_jobs:
+        trajectory_path(job_id).unlink(missing_ok=True)
+        return
+
+    if histogram is not None:
+        rdf_histograms[job_id] = histogram
+
+    # Update status to completed
+    job.status = "completed"
+    job.progress = 1.0
+    job.message = "Simulation completed successfully"
+    job.result = results
+
+
+def init_worker(progress_queue: Any) -> None:
+    """Worker process initializer: keep the progress queue and warm up JIT kernels."""
+    global _worker_progress
+    _worker_progress = progress_queue
+    warmup_kernels()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared worker pool, creating it on first use."""
+    global _executor, _progress_queue
+    if _executor is None:
+        # Spawned workers avoid forking a process whose JIT thread pools
+        # are already running; CPU_CORES caps the pool size. The progress
+        # queue can only reach workers as an initializer argument
+        ctx = multiprocessing.get_context("spawn")
+        _progress_queue = ctx.Queue()
+        _executor = ProcessPoolExecutor(
+            max_workers=int(os.environ.get("CPU_CORES", 0)) or None,
+            mp_context=ctx,
+            initializer=init_worker,
+            initargs=(_progress_queue,)
+        )
+    return _executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Compile JIT analysis kernels before serving; stop workers on exit."""
+    global _executor, _progress_queue
+    warmup_kernels()
+    yield
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+    if _progress_queue is not None:
+        _progress_queue.close()
+        _progress_queue = None
 
 
 # Create FastAPI app
@@ -182,7 +431,8 @@ app = FastAPI(
     description="REST API for Brownian dynamics simulations and nanorobotics research",
     version=__version__,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -231,7 +481,7 @@ async def start_simulation(
         message="Simulation queued for execution"
     )
 
-    # Start background task
+    # Hand the job to the worker pool once the response has been sent
     background_tasks.add_task(run_simulation_task, job_id, sim_config, analysis_config)
 
     return simulation_jobs[job_id]
@@ -247,8 +497,16 @@ async def get_simulation_status(job_id: str):
 
 
 @app.get("/simulate/{job_id}/result")
-async def get_simulation_result(job_id: str):
-    """Get results of a completed simulation."""
+async def get_simulation_result(job_id: str, request: Request):
+    """
+    Get results of a completed simulation.
+
+    Clients sending ``Accept: application/vnd.apache.arrow.stream`` receive
+    the trajectory as an Arrow IPC stream instead of the JSON summary.
+    """
+    if ARROW_STREAM_TYPE in request.headers.get("accept", ""):
+        return await get_simulation_result_arrow(job_id)
+
     if job_id not in simulation_jobs:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -259,6 +517,32 @@ async def get_simulation_result(job_id: str):
     return job.result
 
 
+@app.get("/simulate/{job_id}/result.arrow")
+async def get_simulation_result_arrow(job_id: str) -> StreamingResponse:
+    """Stream the trajectory of a completed simulation in Arrow IPC format."""
+    path = completed_trajectory_path(job_id)
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(
+            status_code=501,
+            detail="Arrow output requires pyarrow (pip install 'nanosimlab[arrow]')"
+        )
+
+    return StreamingResponse(iter_trajectory_arrow(path), media_type=ARROW_STREAM_TYPE)
+
+
+@app.get("/simulate/{job_id}/download")
+async def download_trajectory(job_id: str) -> FileResponse:
+    """Download the trajectory of a completed simulation as an NPZ file."""
+    return FileResponse(
+        completed_trajectory_path(job_id),
+        media_type="application/octet-stream",
+        filename=f"trajectory_{job_id}.npz"
+    )
+
+
 @app.get("/jobs")
 async def list_jobs():
     """List all simulation jobs."""
@@ -282,9 +566,34 @@ async def delete_job(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
 
     del simulation_jobs[job_id]
+    rdf_histograms.pop(job_id, None)
+    trajectory_path(job_id).unlink(missing_ok=True)
     return {"message": f"Job {job_id} deleted successfully"}
 
 
+@app.get("/analyze/{job_id}")
+async def reanalyze_rdf(
+    job_id: str,
+    bins: int = Query(100, ge=10, le=RAW_RDF_BINS)
+) -> Dict[str, Any]:
+    """Recompute the RDF of a completed job at a different bin count."""
+    if job_id not in simulation_jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job_id not in rdf_histograms:
+        raise HTTPException(status_code=400, detail="No RDF histogram stored for this job")
+
+    cached = rdf_histograms[job_id]
+    n_raw = len(cached["counts"])
+    if n_raw % bins:
+        raise HTTPException(
+            status_code=400,
+            detail=f"bins must divide the stored histogram resolution ({n_raw})"
+        )
+
+    return {"rdf": rdf_from_histogram(cached, bins)}
+
+
 @app.post("/analyze")
 async def analyze_trajectory(
     trajectory_file: UploadFile = File(...),
@@ -292,20 +601,19 @@ async def analyze_trajectory(
 ):
     """Analyze an uploaded trajectory file."""
     try:
-        # Read uploaded file
-        content = await trajectory_file.read()
-
-        # Create temporary file
+        # Spool the upload to a temporary file in chunks instead of holding
+        # the whole payload in memory
         with tempfile.NamedTemporaryFile(suffix='.npz', delete=False) as tmp_file:
-            tmp_file.write(content)
+            shutil.copyfileobj(trajectory_file.file, tmp_file)
             tmp_path = tmp_file.name
 
         try:
-            # Load trajectory
-            data = np.load(tmp_path)
-            positions = data["positions"]
-            times = data["times"]
-            box = float(data["box"]) if "box" in data else None
+            # Positions are memory-mapped from the upload rather than read
+            # into memory, so the file has to outlive the analysis
+            positions = load_positions(tmp_path)
+            with np.load(tmp_path) as data:
+                times = data["times"]
+                box = float(data["box"]) if "box" in data else None
 
             results = {}
 
@@ -322,19 +630,19 @@ async def analyze_trajectory(
                     positions,
                     box=box,
                     r_max=analysis_config.rdf_max,
-                    bins=analysis_config.rdf_bins
+                    bins=analysis_config.rdf_bins,
+                    backend=analysis_config.rdf_backend
                 )
                 results["rdf"] = {
                     "r": r_values.tolist(),
                     "g": g_values.tolist()
                 }
-
-            return results
-
         finally:
-            # Clean up temporary file
+            # Clean up temporary file once the analysis no longer needs it
             Path(tmp_path).unlink()
 
+        return results
+
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Analysis failed: {str(e)}")
 
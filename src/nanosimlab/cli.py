@@ -11,7 +11,7 @@ import click
 import numpy as np
 from typing import Optional
 
-from .system import BDSimulation
+from .system import BDSimulation, load_positions
 from .potentials import LennardJones, Yukawa
 from .analysis import msd, rdf, diffusion_coefficient
 
@@ -171,17 +171,8 @@ def simulate(
     # Run simulation with progress indication
     click.echo(f"Running simulation: {n} particles, {steps} steps...")
     
-    traj = sim.run(steps=steps, dt=dt, save_every=save_every)
-    
-    # Save trajectory
-    np.savez(
-        out,
-        positions=traj["positions"],
-        times=traj["times"],
-        box=traj["box"],
-        dim=traj["dim"],
-        n_particles=traj["n_particles"]
-    )
+    # Frames stream into a memory-mapped positions file next to `out`
+    traj = sim.run(steps=steps, dt=dt, save_every=save_every, out_path=out)
     
     click.echo(f"Simulation complete! Saved {traj['positions'].shape[0]} "
                f"frames to {out}")
@@ -202,6 +193,7 @@ def simulate(
 )
 @click.option(
     "--rdf/--no-rdf", 
+    "do_rdf", 
     default=True, 
     help="Compute radial distribution function"
 )
@@ -226,7 +218,7 @@ def simulate(
 def analyze(
     traj: str,
     box: Optional[float],
-    rdf: bool,
+    do_rdf: bool,
     do_msd: bool,
     do_diffusion: bool,
     output: Optional[str]
@@ -236,6 +228,8 @@ def analyze(
     # Load trajectory data
     try:
         data = np.load(traj)
+        # Memory-mapped when stored uncompressed, as `simulate` writes them
+        positions = load_positions(traj)
     except FileNotFoundError:
         click.echo(f"Error: Trajectory file '{traj}' not found.", err=True)
         return
@@ -243,7 +237,6 @@ def analyze(
         click.echo(f"Error loading trajectory: {e}", err=True)
         return
     
-    positions = data["positions"]
     times = data["times"]
     file_box = float(data["box"]) if "box" in data and data["box"] else None
     dim = int(data["dim"]) if "dim" in data else 3
@@ -279,7 +272,7 @@ def analyze(
                 click.echo(f"Could not compute diffusion coefficient: {e}")
     
     # Radial distribution function
-    if rdf:
+    if do_rdf:
         if box_size is None:
             click.echo("Warning: RDF requires periodic boundaries. Skipping.")
         else:
@@ -19,7 +19,10 @@ def overdamped_langevin_step(
     dt: float,
     temperature: float = 1.0,
     gamma: float = 1.0,
-    rng: Optional[np.random.Generator] = None
+    rng: Optional[np.random.Generator] = None,
+    out_drift: Optional[np.ndarray] = None,
+    out_noise: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
     Perform one Euler-Maruyama integration step for overdamped Langevin
@@ -39,6 +42,10 @@ def overdamped_langevin_step(
         temperature: System temperature (reduced units)
         gamma: Friction coefficient
         rng: Random number generator (creates new if None)
+        out_drift: Optional scratch array (N, dim) for the drift term
+        out_noise: Optional scratch array (N, dim) for the noise term
+        out: Optional array (N, dim) for the new positions; may be ``x``
+            itself to update in place
 
     Returns:
         New positions after one integration step (N, dim)
@@ -47,13 +54,20 @@ def overdamped_langevin_step(
         rng = np.random.default_rng()
 
     # Deterministic drift term
-    drift = (force / gamma) * dt
+    drift = out_drift if out_drift is not None else np.empty_like(x)
+    np.multiply(force, dt / gamma, out=drift)
 
     # Stochastic diffusion term
     sigma = np.sqrt(2.0 * temperature / gamma * dt)
-    noise = rng.normal(0.0, 1.0, size=x.shape) * sigma
+    noise = out_noise if out_noise is not None else np.empty_like(x)
+    rng.standard_normal(out=noise, dtype=noise.dtype)
+    np.multiply(noise, sigma, out=noise)
 
-    return x + drift + noise
+    if out is None:
+        out = np.empty_like(x)
+    np.add(x, drift, out=out)
+    out += noise
+    return out
 
 
 def velocity_verlet_step(
@@ -61,7 +75,9 @@ def velocity_verlet_step(
     v: np.ndarray,
     force_func,
     dt: float,
-    mass: float = 1.0
+    mass: float = 1.0,
+    out_x: Optional[np.ndarray] = None,
+    out_v: Optional[np.ndarray] = None
 ) -> tuple[np.ndarray, np.ndarray]:
     """
     Perform one velocity-Verlet integration step for Newtonian dynamics.
@@ -75,20 +91,33 @@ def velocity_verlet_step(
         force_func: Function that computes forces given positions
         dt: Time step
         mass: Particle mass
+        out_x: Optional array (N, dim) for the new positions; may be ``x``
+        out_v: Optional array (N, dim) for the new velocities; may be ``v``
 
     Returns:
         Tuple of (new_positions, new_velocities)
     """
+    half_dt_over_m = 0.5 * dt / mass
+
     # Current forces
     f_current = force_func(x)
 
-    # Update positions
-    x_new = x + v * dt + 0.5 * (f_current / mass) * dt**2
+    # Update positions: x + dt * (v + f/(2m) * dt), with a single temporary
+    tmp = np.multiply(f_current, half_dt_over_m)
+    tmp += v
+    tmp *= dt
+    if out_x is None:
+        out_x = np.empty_like(x)
+    np.add(x, tmp, out=out_x)
 
     # Compute forces at new positions
-    f_new = force_func(x_new)
+    f_new = force_func(out_x)
 
     # Update velocities
-    v_new = v + 0.5 * (f_current + f_new) / mass * dt
+    np.add(f_current, f_new, out=tmp)
+    tmp *= half_dt_over_m
+    if out_v is None:
+        out_v = np.empty_like(v)
+    np.add(v, tmp, out=out_v)
 
-    return x_new, v_new
+    return out_x, out_v
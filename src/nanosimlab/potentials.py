@@ -13,25 +13,25 @@ import numpy as np
 class PairPotential:
     """Base class for pair potential implementations."""
 
-    def force(self, r_vec: np.ndarray, r: np.ndarray) -> np.ndarray:
+    def force(self, r_vec: np.ndarray, r2: np.ndarray) -> np.ndarray:
         """
         Compute force between particle pairs.
 
         Args:
-            r_vec: Displacement vectors between pairs (M, dim)
-            r: Distances between pairs (M,)
+            r_vec: Displacement vectors x_i - x_j between pairs (M, dim)
+            r2: Squared distances between pairs (M,)
 
         Returns:
-            Forces on each pair (M, dim)
+            Forces on particle i of each pair (M, dim)
         """
         raise NotImplementedError
 
-    def energy(self, r: np.ndarray) -> np.ndarray:
+    def energy(self, r2: np.ndarray) -> np.ndarray:
         """
         Compute potential energy between particle pairs.
 
         Args:
-            r: Distances between pairs (M,)
+            r2: Squared distances between pairs (M,)
 
         Returns:
             Potential energies (M,)
@@ -64,36 +64,40 @@ class LennardJones(PairPotential):
         self.eps = float(epsilon)
         self.sigma = float(sigma)
         self.rcut = float(rcut) if rcut is not None else None
+        self.rcut2 = self.rcut**2 if self.rcut is not None else np.inf
 
-    def _mask(self, r: np.ndarray) -> np.ndarray:
-        """Apply cutoff mask to distances."""
-        if self.rcut is None:
-            return np.ones_like(r, dtype=bool)
-        return r < self.rcut
+        # Loop-invariant coefficients, also passed to the JIT kernels
+        self._eps24 = 24.0 * self.eps
+        self._eps4 = 4.0 * self.eps
+        self._sigma2 = self.sigma * self.sigma
 
-    def force(self, r_vec: np.ndarray, r: np.ndarray) -> np.ndarray:
+    def _mask(self, r2: np.ndarray) -> np.ndarray:
+        """Apply cutoff mask to squared distances."""
+        return (r2 > 0) & (r2 < self.rcut2)
+
+    def force(self, r_vec: np.ndarray, r2: np.ndarray) -> np.ndarray:
         """Compute Lennard-Jones forces."""
-        mask = self._mask(r) & (r > 0)
-        invr = np.zeros_like(r)
-        invr[mask] = 1.0 / r[mask]
-        sr = self.sigma * invr
-        sr6 = sr**6
-        sr12 = sr6**2
-        # F = -dU/dr * r_vec/r = 24ε/r * (2(σ/r)^12 - (σ/r)^6) * r_vec/r
-        mag = 24 * self.eps * invr * (2 * sr12 - sr6) * invr**2
-        mag[~mask] = 0.0
-        return (r_vec.T * mag).T
-
-    def energy(self, r: np.ndarray) -> np.ndarray:
+        r2 = r2.astype(np.float64, copy=False)
+        mask = self._mask(r2)
+        invr2 = np.zeros_like(r2)
+        invr2[mask] = 1.0 / r2[mask]
+        sr2 = self._sigma2 * invr2
+        sr6 = sr2 * sr2 * sr2
+        sr12 = sr6 * sr6
+        # F = -dU/dr * r_vec/r = 24ε/r² * (2(σ/r)^12 - (σ/r)^6) * r_vec
+        mag = self._eps24 * (2 * sr12 - sr6) * invr2
+        # Scale in float64: overlapping pairs give magnitudes far beyond
+        # float32 precision, so only the product is cast back
+        return (r_vec * mag[..., None]).astype(r_vec.dtype, copy=False)
+
+    def energy(self, r2: np.ndarray) -> np.ndarray:
         """Compute Lennard-Jones potential energy."""
-        mask = self._mask(r) & (r > 0)
-        sr = np.zeros_like(r)
-        sr[mask] = self.sigma / r[mask]
-        sr6 = sr**6
-        sr12 = sr6**2
-        U = 4 * self.eps * (sr12 - sr6)
-        U[~mask] = 0.0
-        return U
+        mask = self._mask(r2)
+        sr2 = np.zeros_like(r2)
+        sr2[mask] = self._sigma2 / r2[mask]
+        sr6 = sr2 * sr2 * sr2
+        sr12 = sr6 * sr6
+        return self._eps4 * (sr12 - sr6)
 
 
 class Yukawa(PairPotential):
@@ -121,34 +125,34 @@ class Yukawa(PairPotential):
         self.A = float(A)
         self.kappa = float(kappa)
         self.rcut = float(rcut) if rcut is not None else None
+        self.rcut2 = self.rcut**2 if self.rcut is not None else np.inf
+
+    def _mask(self, r2: np.ndarray) -> np.ndarray:
+        """Apply cutoff mask to squared distances."""
+        return (r2 > 0) & (r2 < self.rcut2)
 
-    def _mask(self, r: np.ndarray) -> np.ndarray:
-        """Apply cutoff mask to distances."""
-        if self.rcut is None:
-            return r > 0
-        return (r > 0) & (r < self.rcut)
+    def _distance(self, r2: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Distances, with the square root taken only inside the cutoff."""
+        r = np.zeros_like(r2)
+        np.sqrt(r2, out=r, where=mask)
+        return r
 
-    def force(self, r_vec: np.ndarray, r: np.ndarray) -> np.ndarray:
+    def force(self, r_vec: np.ndarray, r2: np.ndarray) -> np.ndarray:
         """Compute Yukawa forces."""
-        mask = self._mask(r)
-        invr = np.zeros_like(r)
-        invr[mask] = 1.0 / r[mask]
-        expkr = np.zeros_like(r)
-        expkr[mask] = np.exp(-self.kappa * r[mask])
-        # dU/dr = A * (-κ * exp(-κr)/r - exp(-κr)/r^2)
-        dUdr = np.zeros_like(r)
-        dUdr[mask] = self.A * (
-            -self.kappa * expkr[mask] * invr[mask]
-            - expkr[mask] * invr[mask]**2
-        )
-        mag = -dUdr / np.where(r > 0, r, 1.0)  # F = -dU/dr * r_vec/r
-        return (r_vec.T * mag).T
-
-    def energy(self, r: np.ndarray) -> np.ndarray:
+        mask = self._mask(r2)
+        # Only pairs inside the cutoff pay for the sqrt and exp
+        r_in = np.sqrt(r2[mask])
+        inv_in = 1.0 / r_in
+        exp_in = np.exp(-self.kappa * r_in)
+        # dU/dr = -A * exp(-κr)/r * (κ + 1/r); F = -dU/dr * r_vec/r
+        mag = np.zeros(r2.shape)
+        mag[mask] = self.A * exp_in * inv_in * (self.kappa + inv_in) * inv_in
+        return (r_vec * mag[..., None]).astype(r_vec.dtype, copy=False)
+
+    def energy(self, r2: np.ndarray) -> np.ndarray:
         """Compute Yukawa potential energy."""
-        mask = self._mask(r)
-        invr = np.zeros_like(r)
-        invr[mask] = 1.0 / r[mask]
+        mask = self._mask(r2)
+        r = self._distance(r2, mask)
         U = np.zeros_like(r)
-        U[mask] = self.A * np.exp(-self.kappa * r[mask]) * invr[mask]
+        U[mask] = self.A * np.exp(-self.kappa * r[mask]) / r[mask]
         return U
@@ -7,25 +7,290 @@ including boundary conditions, force calculations, and trajectory management.
 
 from __future__ import annotations
 
+import itertools
+import struct
+import zipfile
+from pathlib import Path
+
 import numpy as np
-from typing import Optional, Dict, Any, Callable
+from numpy.typing import DTypeLike
+from typing import IO, Optional, Dict, Any, Callable, Tuple
+from ._kernels import (
+    NUMBA_AVAILABLE,
+    build_cell_sort,
+    get_num_threads,
+    lj_forces_allpairs,
+    lj_forces_cells,
+    run_bd_lj,
+    set_num_threads,
+)
 from .integrators import overdamped_langevin_step
+from .potentials import LennardJones, Yukawa
+
+# Size of the frame block buffered before it is appended to an output NPZ
+_STREAM_BLOCK_BYTES = 4 * 1024 * 1024
 
+# Largest system evaluated with dense (N, N, dim) pair arrays instead of a
+# pair list; at this size the arrays fit in cache and need no scatter. Only
+# the built-in potentials, which broadcast over leading axes, take this path
+_DENSE_MAX_N = 128
 
-def minimum_image_displacement(dx: np.ndarray, box: float) -> np.ndarray:
+
+def minimum_image_displacement(
+    dx: np.ndarray,
+    box: Optional[float],
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[np.ndarray] = None
+) -> np.ndarray:
     """
     Apply minimum image convention for periodic boundary conditions.
     
+    Uses dx - box * rint(dx / box), which stays correct for displacements
+    larger than the box and avoids floating-point modulo.
+    
     Args:
         dx: Displacement vectors
-        box: Box length (cubic box assumed)
+        box: Box length (cubic box assumed; None for open boundaries)
+        out: Optional array for the result; may be ``dx`` itself
+        scratch: Optional work array shaped like ``dx``
         
     Returns:
         Corrected displacement vectors
     """
     if box is None:
         return dx
-    return dx - box * np.round(dx / box)
+    tmp = scratch if scratch is not None else np.empty_like(dx)
+    np.multiply(dx, 1.0 / box, out=tmp)
+    np.rint(tmp, out=tmp)
+    tmp *= box
+    return np.subtract(dx, tmp, out=out)
+
+
+def load_positions(path: str) -> np.ndarray:
+    """
+    Load the ``positions`` array of a trajectory NPZ.
+    
+    Archives written by ``BDSimulation.run(out_path=...)`` store positions
+    uncompressed, so they are memory-mapped read-only straight out of the
+    archive; compressed members are read into memory as by ``np.load``.
+    
+    Args:
+        path: Trajectory NPZ file
+        
+    Returns:
+        Positions array (T, N, dim)
+    """
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo("positions.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        with np.load(path) as data:
+            return data["positions"]
+    
+    with open(path, "rb") as f:
+        # The member data follows its local file header and variable fields
+        f.seek(info.header_offset + 26)
+        name_len, extra_len = struct.unpack("<HH", f.read(4))
+        f.seek(name_len + extra_len, 1)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape, offset=offset,
+                     order="F" if fortran else "C")
+
+
+class _FrameBuffer:
+    """
+    Trajectory frames of a run, kept in memory or streamed into an NPZ.
+    
+    Without ``out_path`` the buffer holds every frame. With it, the buffer
+    holds a block of frames that is appended to an uncompressed
+    ``positions.npy`` archive member whenever it fills up, so each frame is
+    written to disk exactly once.
+    """
+    
+    def __init__(
+        self,
+        shape: Tuple[int, int, int],
+        dtype: np.dtype,
+        out_path: Optional[str] = None
+    ) -> None:
+        self.out_path = out_path
+        self.count = 0
+        self._filled = 0
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._stream: Optional[IO[bytes]] = None
+        if out_path is None:
+            self.block = np.empty(shape, dtype=dtype)
+            return
+        
+        frame_bytes = max(shape[1] * shape[2] * dtype.itemsize, 1)
+        n_block = min(shape[0], max(1, _STREAM_BLOCK_BYTES // frame_bytes))
+        self.block = np.empty((n_block,) + shape[1:], dtype=dtype)
+        self._archive = zipfile.ZipFile(out_path, "w", allowZip64=True)
+        self._stream = self._archive.open("positions.npy", "w", force_zip64=True)
+        np.lib.format.write_array_header_1_0(self._stream, {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": shape,
+        })
+    
+    def space(self) -> np.ndarray:
+        """Unused frames of the current block, for kernels to write into."""
+        return self.block[self._filled:]
+    
+    def commit(self, n_frames: int) -> None:
+        """Record ``n_frames`` frames written into ``space()``."""
+        self._filled += n_frames
+        self.count += n_frames
+        if self._filled == len(self.block):
+            self._flush()
+    
+    def append(self, x: np.ndarray) -> None:
+        """Store one frame."""
+        np.copyto(self.block[self._filled], x)
+        self.commit(1)
+    
+    def _flush(self) -> None:
+        """Append the filled part of the block to the archive member."""
+        if self._stream is not None:
+            self._stream.write(self.block[:self._filled].data)
+            self._filled = 0
+    
+    def finish(self, **metadata: Any) -> np.ndarray:
+        """
+        Close the trajectory and return its positions.
+        
+        Streamed trajectories get the ``metadata`` arrays as further NPZ
+        members, and their positions are memory-mapped from the archive.
+        """
+        if self._archive is None or self._stream is None:
+            return self.block[:self.count]
+        self._flush()
+        self._stream.close()
+        for name, value in metadata.items():
+            with self._archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(value))
+        self._archive.close()
+        assert self.out_path is not None
+        return load_positions(self.out_path)
+    
+    def discard(self) -> None:
+        """Abandon a streamed trajectory, removing the partial archive."""
+        if self._archive is not None and self.out_path is not None:
+            if self._stream is not None:
+                self._stream.close()
+            self._archive.close()
+            Path(self.out_path).unlink(missing_ok=True)
+
+
+def forward_cell_offsets(dim: int, padded: bool = False) -> np.ndarray:
+    """
+    Half-shell neighbour cell offsets (13 in 3D, 4 in 2D).
+    
+    Pairing each cell with itself and these forward neighbours visits every
+    pair of adjacent cells exactly once.
+    
+    Args:
+        dim: Spatial dimensionality (2 or 3)
+        padded: Pad 2D offsets with a zero z component, as the compiled
+            cell kernels expect
+        
+    Returns:
+        Offsets (n_offsets, dim), or (n_offsets, 3) if ``padded``
+    """
+    width = 3 if padded else dim
+    return np.array(
+        [o + (0,) * (width - dim)
+         for o in itertools.product((-1, 0, 1), repeat=dim)
+         if o > (0,) * dim],
+        dtype=np.int64
+    )
+
+
+class CellList:
+    """
+    Cell-list neighbour search for short-ranged pair interactions.
+
+    The periodic box is divided into cells of side at least ``rcut``, so every
+    pair closer than the cutoff lies in the same or in adjacent cells.
+    Particles are sorted by cell index and each cell is paired with itself
+    and its forward half of neighbours (13 in 3D, 4 in 2D), which visits
+    every candidate pair exactly once in roughly N * ρ * (3 rcut)^dim work
+    instead of N(N-1)/2.
+    """
+
+    def __init__(self, box: float, rcut: float, dim: int = 3) -> None:
+        """
+        Initialize the cell grid.
+
+        Args:
+            box: Periodic box length (cubic box assumed)
+            rcut: Interaction cutoff radius
+            dim: Spatial dimensionality (2 or 3)
+        """
+        self.box = float(box)
+        self.dim = int(dim)
+        self.ncell = max(int(self.box // rcut), 1)
+        self.cell_size = self.box / self.ncell
+        self.shape = (self.ncell,) * self.dim
+        self.offsets = forward_cell_offsets(self.dim)
+
+    @property
+    def usable(self) -> bool:
+        """True if the grid has the 3 cells per side needed to avoid double counting."""
+        return self.ncell >= 3
+
+    def pairs(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Enumerate candidate pairs from the same or neighbouring cells.
+
+        Args:
+            x: Particle positions (N, dim)
+
+        Returns:
+            Tuple of (i_indices, j_indices) of unique pairs; pairs beyond the
+            cutoff are included and must be masked by the caller
+        """
+        n = len(x)
+        cells = np.floor(x / self.cell_size).astype(np.int32) % self.ncell
+        cell_id = np.ravel_multi_index(cells.T, self.shape)
+
+        order = np.argsort(cell_id, kind="stable")
+        cells = cells[order]
+        cell_id = cell_id[order]
+        bounds = np.searchsorted(cell_id, np.arange(self.ncell**self.dim + 1))
+        start, end = bounds[:-1], bounds[1:]
+
+        # Same cell: each particle pairs with those sorted after it
+        pos = np.arange(n)
+        chunks = [_expand_ranges(pos, pos + 1, end[cell_id])]
+
+        for offset in self.offsets:
+            neighbour = np.ravel_multi_index(
+                ((cells + offset) % self.ncell).T, self.shape
+            )
+            chunks.append(_expand_ranges(pos, start[neighbour], end[neighbour]))
+
+        p_i = np.concatenate([c[0] for c in chunks])
+        p_j = np.concatenate([c[1] for c in chunks])
+        return order[p_i], order[p_j]
+
+
+def _expand_ranges(
+    owner: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand per-owner index ranges [lo, hi) into flat (owner, index) pairs."""
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    first = np.cumsum(counts) - counts
+    idx = np.arange(total) + np.repeat(lo - first, counts)
+    return np.repeat(owner, counts), idx
 
 
 class BDSimulation:
@@ -44,7 +309,11 @@ class BDSimulation:
         temperature: float = 1.0,
         gamma: float = 1.0,
         potential=None,
-        seed: Optional[int] = None
+        seed: Optional[int] = None,
+        backend: str = "auto",
+        dtype: DTypeLike = np.float64,
+        n_threads: Optional[int] = None,
+        skin: float = 0.3
     ):
         """
         Initialize Brownian dynamics simulation.
@@ -57,15 +326,72 @@ class BDSimulation:
             gamma: Friction coefficient
             potential: Pair potential object
             seed: Random seed for reproducibility
+            backend: Force kernel: 'numpy', 'numba' or 'auto' (numba if
+                installed). The numba kernel covers Lennard-Jones potentials;
+                other potentials always use NumPy.
+            dtype: Floating-point type of positions, forces and noise.
+                Squared pair distances are always accumulated in float64.
+                float32 halves memory traffic but needs a start without
+                overlapping particles, whose forces exceed its precision
+            n_threads: Threads used by the numba kernels (None leaves numba's
+                current setting, one per core unless changed)
+            skin: Verlet-list skin added to the potential cutoff; the pair
+                list is rebuilt once a particle has moved more than half of
+                it (0 rebuilds every step)
         """
         assert dim in (2, 3), "Dimensionality must be 2 or 3"
+        if backend == "auto":
+            backend = "numba" if NUMBA_AVAILABLE else "numpy"
+        if backend not in ("numpy", "numba"):
+            raise ValueError(f"Unknown force backend: {backend}")
+        if backend == "numba" and not NUMBA_AVAILABLE:
+            raise ImportError("backend='numba' requires the numba package")
         self.n = int(n)
         self.dim = int(dim)
         self.box = float(box) if box is not None else None
         self.temperature = float(temperature)
         self.gamma = float(gamma)
         self.potential = potential
-        self.rng = np.random.default_rng(seed)
+        self.backend = backend
+        self.dtype = np.dtype(dtype)
+        self.n_threads = n_threads
+        self.skin = float(skin)
+        # SFC64 draws bulk normals faster than the default PCG64
+        self.rng = np.random.Generator(np.random.SFC64(seed))
+        
+        # Verlet neighbour list for potentials with a cutoff, built from a
+        # cell list over rcut + skin when the box is large enough
+        rcut = getattr(potential, "rcut", None)
+        self._verlet = rcut is not None
+        self._list_cutoff2 = (rcut + self.skin)**2 if rcut is not None else np.inf
+        self._list_cells: Optional[CellList] = None
+        if self.box is not None and rcut is not None:
+            cells = CellList(self.box, rcut + self.skin, self.dim)
+            if cells.usable:
+                self._list_cells = cells
+        self._x_ref: Optional[np.ndarray] = None
+        self._pair_i = self._pair_j = np.empty(0, dtype=np.intp)
+        self._idx_i: Optional[np.ndarray] = None
+        self._idx_j: Optional[np.ndarray] = None
+        
+        # Cell grid for the JIT Lennard-Jones kernels; their cell-sort and
+        # per-thread buffers are allocated on first use
+        self._cells: Optional[CellList] = None
+        if (backend == "numba" and isinstance(potential, LennardJones)
+                and self.box is not None and rcut is not None):
+            cells = CellList(self.box, rcut, self.dim)
+            if cells.usable:
+                self._cells = cells
+        self._cell_sort: Optional[Tuple[np.ndarray, ...]] = None
+        self._F_local: Optional[np.ndarray] = None
+        
+        # Scratch buffers reused across integration steps
+        self._F = np.empty((self.n, self.dim), dtype=self.dtype)
+        self._drift = np.empty_like(self._F)
+        self._noise = np.empty_like(self._F)
+        self._r_vec = np.empty((0, self.dim), dtype=self.dtype)
+        self._mi_scratch = np.empty_like(self._r_vec)
+        self._r2 = np.empty(0)
         
         # Initialize particle positions
         self.x = self._random_positions()
@@ -73,8 +399,10 @@ class BDSimulation:
     def _random_positions(self) -> np.ndarray:
         """Generate random initial positions avoiding severe overlaps."""
         if self.box is None:
-            return self.rng.uniform(-5, 5, size=(self.n, self.dim))
-        return self.rng.uniform(0, self.box, size=(self.n, self.dim))
+            x = self.rng.uniform(-5, 5, size=(self.n, self.dim))
+        else:
+            x = self.rng.uniform(0, self.box, size=(self.n, self.dim))
+        return x.astype(self.dtype)
 
     def _pair_deltas(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray, 
                                                   np.ndarray, np.ndarray]:
@@ -85,97 +413,305 @@ class BDSimulation:
             x: Particle positions (N, dim)
             
         Returns:
-            Tuple of (displacement_vectors, distances, i_indices, j_indices)
+            Tuple of (displacement_vectors, squared_distances, i_indices, j_indices)
         """
-        # Upper triangular indices for unique pairs
-        idx_i, idx_j = np.triu_indices(self.n, k=1)
-        r_vec = x[idx_j] - x[idx_i]
+        if self._verlet:
+            idx_i, idx_j = self._neighbor_pairs(x)
+        else:
+            idx_i, idx_j = self._all_pairs()
+        
+        # Gather into pair buffers that persist while the pair list does
+        r_vec, r2, scratch = self._pair_buffers(len(idx_i), x.dtype)
+        np.take(x, idx_i, axis=0, out=r_vec)
+        np.subtract(r_vec, np.take(x, idx_j, axis=0, out=scratch), out=r_vec)
         
         if self.box is not None:
-            r_vec = minimum_image_displacement(r_vec, self.box)
+            minimum_image_displacement(r_vec, self.box, out=r_vec, scratch=scratch)
             
-        r = np.linalg.norm(r_vec, axis=1)
-        return r_vec, r, idx_i, idx_j
+        np.einsum("ij,ij->i", r_vec, r_vec, dtype=np.float64, out=r2)
+        return r_vec, r2, idx_i, idx_j
+
+    def _all_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Upper triangular indices of all unique pairs, built once on first use."""
+        if self._idx_i is None or self._idx_j is None:
+            self._idx_i, self._idx_j = np.triu_indices(self.n, k=1)
+        return self._idx_i, self._idx_j
+
+    def _pair_buffers(
+        self,
+        n_pairs: int,
+        dtype: np.dtype
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pair displacement, r² and scratch buffers, reallocated on size change."""
+        if len(self._r_vec) != n_pairs or self._r_vec.dtype != dtype:
+            self._r_vec = np.empty((n_pairs, self.dim), dtype=dtype)
+            self._mi_scratch = np.empty_like(self._r_vec)
+            self._r2 = np.empty(n_pairs, dtype=np.float64)
+        return self._r_vec, self._r2, self._mi_scratch
 
-    def compute_forces(self, x: np.ndarray) -> np.ndarray:
+    def _neighbor_pairs(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Verlet-list pairs within rcut + skin, rebuilt only when needed.
+        
+        The list stays valid until some particle has moved more than half
+        the skin since it was built, since no pair outside rcut + skin can
+        come within rcut before then.
+        """
+        if self._x_ref is not None:
+            disp = minimum_image_displacement(x - self._x_ref, self.box)
+            max_disp2 = np.einsum("ij,ij->i", disp, disp).max(initial=0.0)
+            if max_disp2 <= (0.5 * self.skin)**2:
+                return self._pair_i, self._pair_j
+        
+        if self._list_cells is not None:
+            idx_i, idx_j = self._list_cells.pairs(x)
+        else:
+            idx_i, idx_j = self._all_pairs()
+        r_vec = minimum_image_displacement(x[idx_i] - x[idx_j], self.box)
+        keep = np.einsum("ij,ij->i", r_vec, r_vec, dtype=np.float64) < self._list_cutoff2
+        
+        self._pair_i, self._pair_j = idx_i[keep], idx_j[keep]
+        self._x_ref = x.copy()
+        return self._pair_i, self._pair_j
+
+    def compute_forces(
+        self,
+        x: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Compute total forces on all particles.
         
         Args:
             x: Particle positions (N, dim)
+            out: Optional array (N, dim) to write the forces into
             
         Returns:
             Forces on each particle (N, dim)
         """
-        r_vec, r, i_idx, j_idx = self._pair_deltas(x)
+        F = out if out is not None else np.empty_like(x)
         
         if self.potential is None:
-            F_pairs = np.zeros_like(r_vec)
-        else:
-            F_pairs = self.potential.force(r_vec, r)
+            F.fill(0.0)
+            return F
+        
+        if self.backend == "numba" and isinstance(self.potential, LennardJones):
+            return self._lj_forces_numba(x, F)
+        
+        if self.n <= _DENSE_MAX_N and isinstance(self.potential, (LennardJones, Yukawa)):
+            return self._dense_forces(x, F)
+        
+        r_vec, r2, i_idx, j_idx = self._pair_deltas(x)
+        F_pairs = self.potential.force(r_vec, r2)
         
         # Accumulate pairwise forces: F_i += F_ij, F_j -= F_ij
-        F = np.zeros_like(x)
-        np.add.at(F, i_idx, F_pairs)
-        np.add.at(F, j_idx, -F_pairs)
+        for d in range(self.dim):
+            F[:, d] = (np.bincount(i_idx, weights=F_pairs[:, d], minlength=self.n)
+                       - np.bincount(j_idx, weights=F_pairs[:, d], minlength=self.n))
+        
+        return F
+
+    def _dense_forces(self, x: np.ndarray, F: np.ndarray) -> np.ndarray:
+        """Forces from the full (N, N, dim) displacement tensor, written into ``F``."""
+        dx = x[:, None, :] - x[None, :, :]  # dx[i, j] = x[i] - x[j]
+        if self.box is not None:
+            minimum_image_displacement(dx, self.box, out=dx)
+        r2 = np.einsum("ijk,ijk->ij", dx, dx, dtype=np.float64)
+        # Self pairs sit beyond any cutoff, so potentials mask them out
+        np.fill_diagonal(r2, np.inf)
+        return np.sum(self.potential.force(dx, r2), axis=1, out=F)
+
+    def _lj_forces_numba(self, x: np.ndarray, F: np.ndarray) -> np.ndarray:
+        """Lennard-Jones forces from the fused JIT kernel, written into ``F``."""
+        pot = self.potential
+        box = self.box if self.box is not None else 0.0
+        inv_box = 1.0 / box if box else 0.0
+        x = np.ascontiguousarray(x)
+        if self.n_threads:
+            set_num_threads(self.n_threads)
         
+        if self._cells is not None:
+            ncell = self._cells.ncell
+            cell_start, order, xs, offsets = self._cell_sort_buffers(x.dtype)
+            build_cell_sort(x, box, ncell, cell_start, order, xs)
+            lj_forces_cells(
+                xs, box, inv_box, pot._eps24, pot._sigma2, pot.rcut2, ncell,
+                cell_start, order, offsets, self._thread_forces(), F
+            )
+        else:
+            lj_forces_allpairs(x, box, inv_box, pot._eps24, pot._sigma2, pot.rcut2, F)
         return F
 
+    def _cell_sort_buffers(self, dtype: np.dtype) -> Tuple[np.ndarray, ...]:
+        """Cell-sort buffers and neighbour offsets for the cell kernels, built on first use."""
+        assert self._cells is not None
+        if self._cell_sort is None or self._cell_sort[2].dtype != dtype:
+            self._cell_sort = (
+                np.empty(self._cells.ncell**self.dim + 1, dtype=np.int64),
+                np.empty(self.n, dtype=np.int64),
+                np.zeros((3, self.n), dtype=dtype),
+                forward_cell_offsets(self.dim, padded=True),
+            )
+        return self._cell_sort
+
+    def _thread_forces(self) -> np.ndarray:
+        """Per-thread force buffers for the cell kernel, sized to the thread count."""
+        shape = (get_num_threads(), 3, self.n)
+        if self._F_local is None or self._F_local.shape != shape:
+            self._F_local = np.empty(shape)
+        return self._F_local
+
+    def _run_lj_numba(
+        self,
+        x: np.ndarray,
+        steps: int,
+        dt: float,
+        save_every: int,
+        positions: np.ndarray,
+        times: np.ndarray
+    ) -> None:
+        """Run the compiled Lennard-Jones integrator loop, updating ``x`` in place."""
+        pot = self.potential
+        box = self.box if self.box is not None else 0.0
+        if self.n_threads:
+            set_num_threads(self.n_threads)
+        if self._cells is not None:
+            ncell = self._cells.ncell
+            cell_start, order, xs, offsets = self._cell_sort_buffers(x.dtype)
+            F_local = self._thread_forces()
+        else:
+            ncell = 0
+            cell_start = order = np.empty(0, dtype=np.int64)
+            xs = np.zeros((3, 0), dtype=self.dtype)
+            offsets = np.empty((0, 3), dtype=np.int64)
+            F_local = np.empty((0, 3, 0))
+        
+        run_bd_lj(
+            x, box, pot._eps24, pot._sigma2, pot.rcut2, self.temperature, self.gamma,
+            dt, steps, save_every, ncell, cell_start, order, xs, offsets,
+            F_local, np.empty_like(x), positions, times, int(self.rng.integers(2**32))
+        )
+
+    def _check_finite(self, x: np.ndarray, step: int) -> None:
+        """Raise if the integration has produced non-finite positions."""
+        if not np.isfinite(x).all():
+            raise FloatingPointError(
+                f"Non-finite positions after step {step}; reduce dt or start "
+                "from a configuration without overlapping particles"
+            )
+
     def _apply_pbc(self, x: np.ndarray) -> np.ndarray:
-        """Apply periodic boundary conditions to positions."""
+        """Apply periodic boundary conditions to positions, in place."""
         if self.box is None:
             return x
-        return x % self.box
+        return np.mod(x, self.box, out=x)
 
     def run(
         self,
         steps: int = 10000,
         dt: float = 1e-4,
         save_every: int = 100,
-        callback: Optional[Callable] = None
+        callback: Optional[Callable] = None,
+        out_path: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Run Brownian dynamics simulation.
         
+        With the numba backend, a Lennard-Jones potential and no callback,
+        the whole loop runs in compiled code using numba's own random
+        generator (seeded from ``self.rng``).
+        
+        If ``out_path`` is given, frames are streamed in blocks straight into
+        an uncompressed ``positions.npy`` member of an NPZ at ``out_path``
+        instead of being held in memory; the times, box, dimension and
+        particle count are added at the end, and the returned positions are
+        memory-mapped from the archive (see ``load_positions``).
+        
         Args:
             steps: Number of integration steps
             dt: Time step size
-            save_every: Save trajectory every N steps (0 to disable)
-            callback: Optional callback function called each step
+            save_every: Save trajectory every N steps after the initial
+                frame (0 to disable)
+            callback: Optional callback function called each step as
+                callback(t, x, F) with copies of the positions and forces
+            out_path: Optional NPZ path to stream the trajectory to
             
         Returns:
             Dictionary containing trajectory data
         """
-        positions = []
-        times = []
-        x = self.x.copy()
+        x = self.x.astype(self.dtype)
         
-        for t in range(steps):
-            # Compute forces
-            F = self.compute_forces(x)
+        # Preallocate the trajectory: the initial frame plus one every save_every steps
+        n_frames = steps // save_every + 1 if save_every else 0
+        frames = _FrameBuffer((n_frames, self.n, self.dim), self.dtype, out_path)
+        times = np.arange(n_frames) * save_every * dt
+        try:
+            if n_frames:
+                frames.append(x)
             
-            # Integration step
-            x = overdamped_langevin_step(
-                x, F, dt, 
-                temperature=self.temperature,
-                gamma=self.gamma,
-                rng=self.rng
-            )
-            
-            # Apply boundary conditions
-            x = self._apply_pbc(x)
-            
-            # Save trajectory
-            if save_every and (t % save_every == 0):
-                positions.append(x.copy())
-                times.append(t * dt)
+            if (callback is None and self.backend == "numba"
+                    and isinstance(self.potential, LennardJones)):
+                x = np.ascontiguousarray(x)
+                step = 0
+                while step < steps:
+                    # Run to the end, or until the frame buffer is full
+                    out = frames.space()
+                    chunk = steps - step
+                    if save_every and chunk // save_every > len(out):
+                        chunk = len(out) * save_every
+                    self._run_lj_numba(x, chunk, dt, save_every, out, np.empty(len(out)))
+                    frames.commit(chunk // save_every if save_every else 0)
+                    step += chunk
+            else:
+                free = self.potential is None
+                if free:
+                    # Free diffusion: forces stay zero, only noise moves particles
+                    zero_force = np.zeros_like(x)
+                    noise_scale = np.sqrt(2.0 * self.temperature / self.gamma * dt)
                 
-            # User callback
-            if callback is not None:
-                callback(t, x, F)
+                for t in range(steps):
+                    if free:
+                        F = zero_force
+                        self.rng.standard_normal(out=self._noise, dtype=self._noise.dtype)
+                        self._noise *= noise_scale
+                        x += self._noise
+                    else:
+                        # Compute forces
+                        F = self.compute_forces(x, out=self._F)
+                        
+                        # Integration step
+                        x = overdamped_langevin_step(
+                            x, F, dt, 
+                            temperature=self.temperature,
+                            gamma=self.gamma,
+                            rng=self.rng,
+                            out_drift=self._drift,
+                            out_noise=self._noise,
+                            out=x
+                        )
+                    # Apply boundary conditions
+                    self._apply_pbc(x)
+                    # Save trajectory
+                    if save_every and ((t + 1) % save_every == 0):
+                        self._check_finite(x, t + 1)
+                        frames.append(x)
+                    
+                    # User callback; x and F are reused buffers, so hand out
+                    # snapshots the callback may keep
+                    if callback is not None:
+                        callback(t, x.copy(), F.copy())
+            
+            self._check_finite(x, steps)
+        except BaseException:
+            frames.discard()
+            raise
         
-        positions = np.array(positions)  # (frames, N, dim)
-        times = np.array(times)
+        positions = frames.finish(
+            times=times,
+            box=self.box if self.box is not None else 0.0,
+            dim=self.dim,
+            n_particles=self.n
+        )
         
         # Update internal state
         self.x = x
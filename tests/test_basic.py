@@ -5,12 +5,25 @@ This module provides unit tests for core simulation components
 to ensure correctness and catch regressions.
 """
 
+import io
+
 import numpy as np
 import pytest
+from fastapi.testclient import TestClient
 
-from nanosimlab.system import BDSimulation
-from nanosimlab.potentials import LennardJones, Yukawa
-from nanosimlab.analysis import msd, rdf, diffusion_coefficient
+from nanosimlab import api
+from nanosimlab._kernels import NUMBA_AVAILABLE
+from nanosimlab.system import BDSimulation, CellList, minimum_image_displacement
+from nanosimlab.potentials import LennardJones, PairPotential, Yukawa
+from nanosimlab.analysis import (
+    diffusion_coefficient,
+    msd,
+    normalize_rdf,
+    pair_histogram,
+    rdf,
+    rdf_spectral,
+    rebin_histogram,
+)
 
 
 class TestPotentials:
@@ -20,29 +33,34 @@ class TestPotentials:
         """Test basic LJ potential functionality."""
         lj = LennardJones(epsilon=1.0, sigma=1.0, rcut=2.5)
         
-        # Test at sigma (minimum)
-        r = np.array([1.0])
-        r_vec = np.array([[1.0, 0.0, 0.0]])
+        # Test at the minimum r = 2^(1/6) sigma and at sigma
+        r2 = np.array([2.0**(1 / 3), 1.0])
+        r_vec = np.array([[2.0**(1 / 6), 0.0, 0.0], [1.0, 0.0, 0.0]])
         
-        energy = lj.energy(r)
-        force = lj.force(r_vec, r)
+        energy = lj.energy(r2)
+        force = lj.force(r_vec, r2)
         
         assert energy[0] == pytest.approx(-1.0, abs=1e-10)
         assert force[0, 0] == pytest.approx(0.0, abs=1e-10)
+        assert energy[1] == pytest.approx(0.0, abs=1e-10)
+        # Repulsive inside the minimum: pushes i away from j, along x_i - x_j
+        assert force[1, 0] == pytest.approx(24.0)
     
     def test_yukawa_basic(self):
         """Test basic Yukawa potential functionality."""
         yuk = Yukawa(A=1.0, kappa=1.0)
         
-        r = np.array([1.0])
+        r2 = np.array([1.0])
         r_vec = np.array([[1.0, 0.0, 0.0]])
         
-        energy = yuk.energy(r)
-        force = yuk.force(r_vec, r)
+        energy = yuk.energy(r2)
+        force = yuk.force(r_vec, r2)
         
         expected_energy = np.exp(-1.0)
         assert energy[0] == pytest.approx(expected_energy, rel=1e-6)
         assert force.shape == (1, 3)
+        # Repulsive for A > 0: -dU/dr = A * exp(-κr) * (κ + 1/r) / r
+        assert force[0, 0] == pytest.approx(2 * np.exp(-1.0), rel=1e-6)
 
 
 class TestSimulation:
@@ -82,6 +100,47 @@ class TestSimulation:
         assert traj["positions"].shape[1] == 16
         assert traj["positions"].shape[2] == 3
     
+    def test_overlapping_start_stays_finite(self):
+        """Test that overlapping random LJ starts never produce NaN frames."""
+        backends = ["numpy"]
+        if NUMBA_AVAILABLE:
+            backends.append("numba")
+        for backend in backends:
+            for seed in range(5):
+                sim = BDSimulation(n=300, box=20.0, dim=2, potential=LennardJones(),
+                                   seed=seed, backend=backend)
+                traj = sim.run(steps=20, dt=1e-4, save_every=5)
+                assert np.isfinite(traj["positions"]).all()
+        
+        # float32 cannot hold the overlap forces; it must fail loudly
+        sim = BDSimulation(n=300, box=20.0, dim=2, potential=LennardJones(),
+                           seed=0, backend="numpy", dtype=np.float32)
+        with pytest.raises(FloatingPointError), np.errstate(all="ignore"):
+            sim.run(steps=20, dt=1e-4, save_every=5)
+    
+    def test_callback_receives_snapshots(self):
+        """Test that callback arrays are not overwritten by later steps."""
+        sim = BDSimulation(n=16, box=8.0, potential=Yukawa(rcut=2.0), seed=4)
+        
+        frames = []
+        sim.run(steps=5, dt=1e-3, save_every=1,
+                callback=lambda t, x, F: frames.append((x, F)))
+        
+        assert len({x.tobytes() for x, _ in frames}) == 5
+        assert len({F.tobytes() for _, F in frames}) == 5
+    
+    def test_run_out_path_archive(self, tmp_path):
+        """Test that streamed trajectories load as self-contained NPZ files."""
+        out = str(tmp_path / "traj.npz")
+        sim = BDSimulation(n=16, box=8.0, potential=Yukawa(rcut=2.0), seed=2)
+        traj = sim.run(steps=20, dt=1e-3, save_every=5, out_path=out)
+        
+        assert isinstance(traj["positions"], np.memmap)
+        with np.load(out) as data:
+            assert np.array_equal(data["positions"], traj["positions"])
+            assert np.array_equal(data["times"], traj["times"])
+        assert [p.name for p in tmp_path.iterdir()] == ["traj.npz"]
+    
     def test_force_calculation(self):
         """Test force calculation."""
         sim = BDSimulation(
@@ -99,6 +158,116 @@ class TestSimulation:
         # Forces should be equal and opposite
         assert forces.shape == (2, 3)
         assert np.allclose(forces[0], -forces[1])
+        
+        # Beyond the LJ minimum the particles attract each other
+        assert forces[0, 0] > 0
+    
+    def test_lj_force_backends(self):
+        """Test the NumPy and JIT Lennard-Jones forces against a direct sum."""
+        pytest.importorskip("numba")
+        rng = np.random.default_rng(2)
+        box, rcut = 10.0, 2.5
+        x = rng.uniform(0, box, (250, 3))
+        
+        d = minimum_image_displacement(x[:, None, :] - x[None, :, :], box)
+        r2 = np.einsum("ijk,ijk->ij", d, d)
+        mask = (r2 > 0) & (r2 < rcut**2)
+        sr6 = np.where(mask, 1.0 / np.where(mask, r2, 1.0), 0.0)**3
+        mag = np.where(mask, 24 * (2 * sr6**2 - sr6) / np.where(mask, r2, 1.0), 0.0)
+        expected = (d * mag[..., None]).sum(axis=1)
+        
+        sim = BDSimulation(n=250, box=box, potential=LennardJones(rcut=rcut),
+                           backend="numba")
+        assert sim._cells is not None
+        assert np.allclose(sim.compute_forces(x), expected)
+        
+        sim._cells = None
+        assert np.allclose(sim.compute_forces(x), expected)
+        
+        sim = BDSimulation(n=250, box=box, potential=LennardJones(rcut=rcut),
+                           backend="numpy")
+        assert sim._cells is None and sim._cell_sort is None
+        assert np.allclose(sim.compute_forces(x), expected)
+    
+    def test_numba_integrator(self):
+        """Test the compiled LJ integrator loop against the NumPy loop."""
+        pytest.importorskip("numba")
+        # Jittered lattice without overlaps; zero temperature removes the
+        # noise so both loops follow the same deterministic trajectory
+        g = np.arange(6) * 2.0 + 0.5
+        lattice = np.stack(np.meshgrid(g, g, g, indexing="ij"), axis=-1).reshape(-1, 3)
+        lattice += np.random.default_rng(4).uniform(-0.2, 0.2, lattice.shape)
+        
+        trajs = []
+        for backend in ("numba", "numpy"):
+            sim = BDSimulation(n=216, box=12.0, temperature=0.0,
+                               potential=LennardJones(epsilon=0.5),
+                               backend=backend, dtype=np.float64)
+            sim.x = lattice.copy()
+            trajs.append(sim.run(steps=200, dt=1e-3, save_every=50))
+        fast, slow = trajs
+        
+        assert fast["positions"].shape == slow["positions"].shape == (5, 216, 3)
+        assert np.allclose(fast["times"], slow["times"])
+        assert np.allclose(fast["positions"], slow["positions"], rtol=0, atol=1e-12)
+        assert not np.allclose(fast["positions"][-1], lattice)
+        assert np.all((fast["positions"] >= 0) & (fast["positions"] <= 12.0))
+    
+    def test_verlet_list_forces(self):
+        """Test that reusing a Verlet list gives the same forces as rebuilding."""
+        rng = np.random.default_rng(6)
+        kwargs = dict(n=300, box=10.0, potential=LennardJones(), backend="numpy",
+                      dtype=np.float64)
+        listed = BDSimulation(skin=0.5, **kwargs)
+        rebuilt = BDSimulation(skin=0.0, **kwargs)
+        
+        x = rng.uniform(0, 10.0, (300, 3))
+        for _ in range(20):
+            x = (x + rng.normal(0, 0.03, x.shape)) % 10.0
+            assert np.allclose(listed.compute_forces(x), rebuilt.compute_forces(x))
+    
+    def test_dense_forces_match_pair_sum(self):
+        """Test the dense small-system force path against an explicit pair sum."""
+        rng = np.random.default_rng(8)
+        box = 8.0
+        yuk = Yukawa(A=2.0, kappa=0.8, rcut=3.0)
+        x = rng.uniform(0, box, (100, 3))
+        
+        i_idx, j_idx = np.triu_indices(100, k=1)
+        r_vec = minimum_image_displacement(x[i_idx] - x[j_idx], box)
+        F_pairs = yuk.force(r_vec, np.sum(r_vec**2, axis=1))
+        expected = np.zeros_like(x)
+        np.add.at(expected, i_idx, F_pairs)
+        np.add.at(expected, j_idx, -F_pairs)
+        
+        sim = BDSimulation(n=100, box=box, potential=yuk, dtype=np.float64)
+        assert np.allclose(sim.compute_forces(x), expected)
+        
+        # User potentials keep receiving flat (M, dim) / (M,) pair arrays
+        class FlatYukawa(PairPotential):
+            def force(self, r_vec, r2):
+                assert r_vec.ndim == 2 and r2.ndim == 1
+                return yuk.force(r_vec, r2)
+        
+        sim = BDSimulation(n=100, box=box, potential=FlatYukawa(), dtype=np.float64)
+        assert np.allclose(sim.compute_forces(x), expected)
+    
+    def test_cell_list_finds_all_pairs_within_cutoff(self):
+        """Test that the cell list reproduces the brute-force neighbour set."""
+        rng = np.random.default_rng(1)
+        box, rcut = 10.0, 2.5
+        x = rng.uniform(0, box, (300, 3))
+        
+        i_idx, j_idx = CellList(box, rcut, dim=3).pairs(x)
+        r = np.linalg.norm(minimum_image_displacement(x[j_idx] - x[i_idx], box), axis=1)
+        found = {tuple(sorted(p)) for p in zip(i_idx[r < rcut], j_idx[r < rcut])}
+        
+        a, b = np.triu_indices(len(x), k=1)
+        r_all = np.linalg.norm(minimum_image_displacement(x[b] - x[a], box), axis=1)
+        expected = set(zip(a[r_all < rcut], b[r_all < rcut]))
+        
+        assert len(i_idx) == len({tuple(sorted(p)) for p in zip(i_idx, j_idx)})
+        assert found == expected
 
 
 class TestAnalysis:
@@ -122,6 +291,29 @@ class TestAnalysis:
         assert msd_vals[0] == 0.0  # MSD starts at zero
         assert msd_vals[-1] > 0.0  # MSD increases
     
+    def test_msd_fft_matches_direct_average(self, monkeypatch):
+        """Test the FFT MSD against an explicit average over time origins."""
+        rng = np.random.default_rng(3)
+        T, N = 120, 8
+        traj = np.cumsum(rng.normal(0, 0.2, (T, N, 3)), axis=0)
+        times = np.arange(T) * 0.1
+        
+        expected = np.array([
+            np.mean(np.sum((traj[m:] - traj[:T - m])**2, axis=2))
+            for m in range(T)
+        ])
+        
+        _, msd_free = msd(traj, times)
+        _, msd_pbc = msd(traj % 4.0, times, box=4.0)
+        
+        assert np.allclose(msd_free, expected)
+        assert np.allclose(msd_pbc, expected)
+        
+        # Blocks of 3 particles, leaving a partial last block
+        monkeypatch.setattr("nanosimlab.analysis._MSD_FFT_BLOCK_BYTES", 8 * 2 * T * 3 * 3)
+        _, msd_blocked = msd(traj % 4.0, times, box=4.0)
+        assert np.allclose(msd_blocked, expected)
+    
     def test_rdf_calculation(self):
         """Test RDF calculation."""
         # Simple 2-particle system
@@ -139,6 +331,69 @@ class TestAnalysis:
         assert np.all(r_vals >= 0)
         assert np.all(g_vals >= 0)
     
+    def test_rdf_backends_agree(self):
+        """Test that the JIT pair kernel matches the NumPy path."""
+        pytest.importorskip("numba")
+        rng = np.random.default_rng(7)
+        positions = rng.uniform(0, 6.0, (5, 40, 3))
+
+        _, g_np = rdf(positions, box=6.0, bins=30, backend="numpy")
+        _, g_nb = rdf(positions, box=6.0, bins=30, backend="numba")
+
+        assert np.allclose(g_np, g_nb)
+
+    def test_rdf_cell_list_matches_brute_force(self):
+        """Test the linked-cell RDF path on a system large enough to use it."""
+        pytest.importorskip("numba")
+        rng = np.random.default_rng(11)
+        positions = rng.uniform(0, 12.0, (3, 400, 3))
+
+        _, g_np = rdf(positions, box=12.0, r_max=3.0, bins=30, backend="numpy")
+        _, g_nb = rdf(positions, box=12.0, r_max=3.0, bins=30, backend="numba")
+
+        assert np.allclose(g_np, g_nb)
+    
+    def test_rdf_rebinned_histogram(self):
+        """Test that rebinning a fine pair histogram reproduces rdf()."""
+        rng = np.random.default_rng(5)
+        positions = rng.uniform(0, 5.0, (4, 30, 3))
+        
+        counts = pair_histogram(positions, box=5.0, bins=100, backend="numpy")
+        r_fine, g_fine = normalize_rdf(
+            rebin_histogram(counts, 20), box=5.0, r_max=2.5,
+            n_particles=30, n_frames=4, dim=3
+        )
+        r_vals, g_vals = rdf(positions, box=5.0, bins=20, backend="numpy")
+        
+        assert np.allclose(r_fine, r_vals)
+        assert np.allclose(g_fine, g_vals)
+    
+    def test_rdf_smooth_kernel(self):
+        """Test that kernel weights conserve pairs and reduce g(r) noise."""
+        rng = np.random.default_rng(6)
+        
+        # Every pair of a small cluster lies well inside r_max
+        cluster = rng.uniform(0, 2.0, (3, 30, 3))
+        hard = pair_histogram(cluster, box=20.0, r_max=10.0, bins=50, backend="numpy")
+        soft = pair_histogram(cluster, box=20.0, r_max=10.0, bins=50, smooth=True)
+        assert hard.sum() == 3 * 30 * 29 / 2
+        assert soft.sum() == pytest.approx(hard.sum())
+        
+        positions = rng.uniform(0, 8.0, (5, 150, 3))
+        r_hard, g_hard = rdf(positions, box=8.0, bins=100, backend="numpy")
+        r_soft, g_soft = rdf(positions, box=8.0, bins=100, smooth=True)
+        assert np.std(g_soft[r_soft > 1.0] - 1) < np.std(g_hard[r_hard > 1.0] - 1)
+    
+    def test_rdf_spectral_ideal_gas(self):
+        """Test that the series RDF of uncorrelated particles is close to 1."""
+        rng = np.random.default_rng(9)
+        positions = rng.uniform(0, 8.0, (10, 150, 3))
+        
+        r_vals, g_vals = rdf_spectral(positions, box=8.0, n_modes=12)
+        
+        assert len(r_vals) == len(g_vals) == 200
+        assert np.mean(g_vals[r_vals > 1.0]) == pytest.approx(1.0, abs=0.05)
+    
     def test_diffusion_coefficient(self):
         """Test diffusion coefficient estimation."""
         # Create MSD data with known slope
@@ -153,6 +408,97 @@ class TestAnalysis:
         assert r2 > 0.9  # Should be good fit for linear data
 
 
+class TestAPI:
+    """Test the REST endpoints serving completed simulation jobs."""
+    
+    @pytest.fixture
+    def job_id(self, tmp_path, monkeypatch):
+        """Run a small job in-process and register it as completed."""
+        monkeypatch.setattr(api, "RESULTS_DIR", tmp_path)
+        job_id = "test-job"
+        sim_params = {
+            "n_particles": 30, "box_size": 6.0, "steps": 200, "save_every": 20,
+            "seed": 3, "potential": {"type": "lj"}
+        }
+        results, histogram = api.execute_simulation(
+            job_id, sim_params, {"rdf_bins": 100, "rdf_backend": "numpy"}
+        )
+        monkeypatch.setitem(api.simulation_jobs, job_id, api.SimulationStatus(
+            job_id=job_id, status="completed", progress=1.0, result=results
+        ))
+        monkeypatch.setitem(api.rdf_histograms, job_id, histogram)
+        return job_id
+    
+    def test_rdf_from_histogram(self, job_id):
+        """Test that cached histograms rebin to the RDF of the trajectory."""
+        cached = api.rdf_histograms[job_id]
+        assert len(cached["counts"]) == api.RAW_RDF_BINS
+        
+        with np.load(api.trajectory_path(job_id)) as data:
+            positions = data["positions"]
+        r_vals, g_vals = rdf(positions, box=6.0, bins=50, backend="numpy")
+        rebinned = api.rdf_from_histogram(cached, 50)
+        
+        assert np.allclose(rebinned["r"], r_vals)
+        assert np.allclose(rebinned["g"], g_vals)
+    
+    def test_reanalyze_rdf(self, job_id):
+        """Test rebinning through the endpoint and its bin-count checks."""
+        client = TestClient(api.app)
+        
+        response = client.get(f"/analyze/{job_id}", params={"bins": 50})
+        assert response.status_code == 200
+        expected = api.rdf_from_histogram(api.rdf_histograms[job_id], 50)
+        assert np.allclose(response.json()["rdf"]["g"], expected["g"])
+        
+        # 400 does not divide the 1000 stored bins
+        response = client.get(f"/analyze/{job_id}", params={"bins": 400})
+        assert response.status_code == 400
+        
+        # Same lower bound as AnalysisConfig.rdf_bins
+        assert client.get(f"/analyze/{job_id}", params={"bins": 5}).status_code == 422
+        
+        assert client.get("/analyze/missing").status_code == 404
+    
+    def test_reanalyze_rdf_without_histogram(self, job_id):
+        """Test that jobs without a cached histogram cannot be rebinned."""
+        del api.rdf_histograms[job_id]
+        
+        response = TestClient(api.app).get(f"/analyze/{job_id}")
+        
+        assert response.status_code == 400
+        assert "No RDF histogram" in response.json()["detail"]
+    
+    def test_download_trajectory(self, job_id):
+        """Test that the downloaded NPZ holds the stored trajectory."""
+        response = TestClient(api.app).get(f"/simulate/{job_id}/download")
+        
+        assert response.status_code == 200
+        with np.load(io.BytesIO(response.content)) as data:
+            assert data["positions"].shape == (11, 30, 3)
+            assert float(data["box"]) == 6.0
+    
+    def test_result_formats(self, job_id):
+        """Test JSON results, the Arrow stream and Accept negotiation."""
+        pa = pytest.importorskip("pyarrow")
+        client = TestClient(api.app)
+        
+        response = client.get(f"/simulate/{job_id}/result")
+        assert response.status_code == 200
+        assert set(response.json()["analysis"]) == {"msd", "rdf"}
+        
+        arrow = client.get(f"/simulate/{job_id}/result.arrow")
+        negotiated = client.get(
+            f"/simulate/{job_id}/result", headers={"Accept": api.ARROW_STREAM_TYPE}
+        )
+        assert arrow.headers["content-type"] == api.ARROW_STREAM_TYPE
+        assert negotiated.content == arrow.content
+        
+        table = pa.ipc.open_stream(arrow.content).read_all()
+        assert table.num_rows == 11 * 30
+        assert table.column_names == ["t", "particle", "x", "y", "z"]
+
+
 class TestIntegration:
     """Integration tests combining multiple components."""
     